@@ -6,30 +6,102 @@ and dispatches commands to the MCP orchestrator.
 """
 
 import os
+import queue
 import logging
 import hmac
 import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, Tuple
+import msgspec
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from dotenv import load_dotenv
 from webexteamssdk import WebexTeamsAPI
 
 from bot.handlers.commands import CommandHandler
 from bot.handlers.cards import CardHandler
+from bot.webex_client import WebexMessenger
+from config.settings import ensure_env_loaded
 
 # Load environment variables
-load_dotenv()
+ensure_env_loaded()
 
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+# The format above does not use thread/process fields, so skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
+
+
+class WebhookData(msgspec.Struct):
+    """The `data` object of a Webex webhook payload."""
+    id: Optional[str] = None
+    roomId: Optional[str] = None
+    personId: Optional[str] = None
+    personEmail: Optional[str] = None
+    text: Optional[str] = None
+    inputs: Optional[Dict[str, Any]] = None
+    
+    def as_event(self, kind: str) -> Optional[SimpleNamespace]:
+        """
+        Build the message/action object from the payload, if it is complete.
+        
+        Args:
+            kind: Webhook resource (messages or attachmentActions)
+        
+        Returns:
+            Object with the fields the handlers read, or None if one is missing
+        """
+        if self.roomId is None or self.personEmail is None:
+            return None
+        if kind == "attachmentActions" and self.inputs is not None:
+            return SimpleNamespace(roomId=self.roomId, personEmail=self.personEmail, inputs=self.inputs)
+        if kind == "messages" and self.text is not None:
+            return SimpleNamespace(roomId=self.roomId, personEmail=self.personEmail, text=self.text)
+        return None
+
+
+class WebhookEnvelope(msgspec.Struct):
+    """A Webex webhook payload (unknown fields are ignored)."""
+    resource: Optional[str] = None
+    event: Optional[str] = None
+    data: WebhookData = msgspec.field(default_factory=WebhookData)
+
+
+_ENVELOPE_DECODER = msgspec.json.Decoder(WebhookEnvelope)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the str round-trip - orjson already produces UTF-8 bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+app.json = OrjsonProvider(app)
+# Only /health may be probed from a browser; webhooks are server-to-server
+CORS(app, resources={r"/health": {"origins": "*"}})
 
 # Initialize Webex API
 webex_token = os.getenv("WEBEX_BOT_TOKEN")
@@ -37,14 +109,68 @@ if not webex_token:
     raise RuntimeError("WEBEX_BOT_TOKEN not set in environment")
 
 webex_api = WebexTeamsAPI(access_token=webex_token)
-bot_email = os.getenv("WEBEX_BOT_EMAIL", webex_api.people.me().emails[0])
 
-# Initialize handlers
-command_handler = CommandHandler(webex_api)
-card_handler = CardHandler(webex_api)
+# Bot identity, cached on disk per token so restarts skip people.me()
+IDENTITY_CACHE_PATH = Path(tempfile.gettempdir()) / "pipeline-notify-bot-identity.json"
+
+
+def _load_bot_identity(api: WebexTeamsAPI, token: str) -> Tuple[str, str]:
+    """
+    Resolve the bot's email and person ID.
+    
+    Args:
+        api: Webex Teams API client
+        token: Bot access token the identity belongs to
+    
+    Returns:
+        Tuple of (email, person_id)
+    """
+    token_hash = hashlib.sha256(token.encode()).hexdigest()[:12]
+    
+    try:
+        cached = orjson.loads(IDENTITY_CACHE_PATH.read_bytes())
+        if cached.get("token_hash") == token_hash:
+            return cached["email"], cached["person_id"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    
+    me = api.people.me()
+    email, person_id = me.emails[0], me.id
+    
+    try:
+        IDENTITY_CACHE_PATH.write_bytes(orjson.dumps({
+            "token_hash": token_hash,
+            "email": email,
+            "person_id": person_id
+        }))
+    except OSError as e:
+        logger.warning("Could not cache bot identity: %s", e)
+    
+    return email, person_id
+
+
+_identity_email, bot_person_id = _load_bot_identity(webex_api, webex_token)
+bot_email = os.getenv("WEBEX_BOT_EMAIL", _identity_email)
+
+# Initialize handlers (replies share one pooled Webex session)
+webex_messenger = WebexMessenger(webex_token)
+command_handler = CommandHandler(webex_api, webex_messenger)
+card_handler = CardHandler(webex_api, webex_messenger)
 
 # Webhook secret for verification
 webhook_secret = os.getenv("WEBEX_WEBHOOK_SECRET", "")
+_SECRET_BYTES = webhook_secret.encode()
+
+# Webex webhook payloads are ~1KB; anything far larger is not from Webex
+WEBHOOK_MAX_BODY = 64 * 1024
+
+# Background dispatch: webhooks are acknowledged immediately and the
+# MCP/Webex round-trips run on worker threads.
+DISPATCH_QUEUE: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=1000)
+DISPATCH_WORKERS = int(os.getenv("BOT_DISPATCH_WORKERS", "8"))
+
+_workers_started = False
+_workers_lock = threading.Lock()
 
 
 def verify_webhook_signature(request_data: bytes, signature: str) -> bool:
@@ -53,11 +179,12 @@ def verify_webhook_signature(request_data: bytes, signature: str) -> bool:
         logger.warning("WEBEX_WEBHOOK_SECRET not set - skipping signature verification")
         return True
     
-    expected = hmac.new(
-        webhook_secret.encode(),
-        request_data,
-        hashlib.sha1
-    ).hexdigest()
+    # Reject before hashing an unsigned or oversized body
+    if not signature or len(request_data) > WEBHOOK_MAX_BODY:
+        return False
+    
+    # Webex signs X-Spark-Signature with HMAC-SHA1 only
+    expected = hmac.digest(_SECRET_BYTES, request_data, "sha1").hex()
     
     return hmac.compare_digest(expected, signature)
 
@@ -76,47 +203,125 @@ def webhook():
     Processes:
     - messages/created: New message from user
     - attachmentActions/created: Card submission (dropdown selection)
+    
+    Events are queued for the dispatch workers and acknowledged with
+    202 right away, so Webex never waits on MCP or Webex round-trips.
     """
+    if (request.content_length or 0) > WEBHOOK_MAX_BODY:
+        return jsonify({"error": "Payload too large"}), 413
+    
     # Verify signature if secret is set
     signature = request.headers.get("X-Spark-Signature", "")
-    if webhook_secret and not verify_webhook_signature(request.data, signature):
+    if webhook_secret and not signature:
+        logger.warning("Missing webhook signature")
+        return jsonify({"error": "Invalid signature"}), 401
+    
+    body = request.get_data()
+    if webhook_secret and not verify_webhook_signature(body, signature):
         logger.warning("Invalid webhook signature")
         return jsonify({"error": "Invalid signature"}), 401
     
-    data = request.json
-    resource = data.get("resource")
-    event = data.get("event")
+    try:
+        envelope = _ENVELOPE_DECODER.decode(body) if body else WebhookEnvelope()
+    except msgspec.DecodeError:
+        return jsonify({"error": "Invalid JSON"}), 400
     
-    logger.info(f"Received webhook: {resource}/{event}")
+    resource = envelope.resource
+    event = envelope.event
     
-    try:
-        if resource == "messages" and event == "created":
-            # Handle new message
-            message_id = data.get("data", {}).get("id")
-            if message_id:
-                message = webex_api.messages.get(message_id)
-                
-                # Ignore messages from the bot itself
-                if message.personEmail == bot_email:
-                    return jsonify({"status": "ignored", "reason": "self-message"})
-                
-                # Process the command
-                response = command_handler.handle_message(message)
-                return jsonify({"status": "processed", "response": response})
+    logger.info("Received webhook: %s/%s", resource, event)
+    
+    # messages/created and attachmentActions/created both carry the item ID
+    if resource in ("messages", "attachmentActions") and event == "created":
+        item = envelope.data
+        item_id = item.id
         
-        elif resource == "attachmentActions" and event == "created":
-            # Handle card action (dropdown selection, button click)
-            action_id = data.get("data", {}).get("id")
-            if action_id:
-                action = webex_api.attachment_actions.get(action_id)
-                response = card_handler.handle_action(action)
-                return jsonify({"status": "processed", "response": response})
+        # Ignore the bot's own messages without fetching them from Webex
+        if resource == "messages" and (
+            item.personId == bot_person_id or item.personEmail == bot_email
+        ):
+            return jsonify({"status": "ignored"})
         
-        return jsonify({"status": "unhandled", "resource": resource, "event": event})
+        if item_id:
+            # Payload fields are only trusted from a signed (and verified)
+            # webhook; otherwise the item is fetched from Webex by ID
+            start_dispatch_workers()
+            try:
+                DISPATCH_QUEUE.put_nowait({
+                    "kind": resource,
+                    "id": item_id,
+                    "event": item.as_event(resource) if webhook_secret else None
+                })
+            except queue.Full:
+                logger.warning("Dispatch queue full - dropping %s %s", resource, item_id)
+                return jsonify({"status": "dropped", "reason": "queue full"}), 503
+            
+            return jsonify({"status": "queued"}), 202
     
-    except Exception as e:
-        logger.exception(f"Error processing webhook: {e}")
-        return jsonify({"error": str(e)}), 500
+    return jsonify({"status": "unhandled", "resource": resource, "event": event})
+
+
+def _process_event(item: Dict[str, Any]) -> None:
+    """
+    Run the handler for a queued webhook item.
+    
+    The message/action is fetched from Webex unless a signed webhook
+    payload already carried the fields the handlers need.
+    """
+    event = item.get("event")
+    
+    if item["kind"] == "messages":
+        message = event or webex_api.messages.get(item["id"])
+        
+        # Ignore messages from the bot itself
+        if message.personEmail == bot_email:
+            return
+        
+        command_handler.handle_message(message)
+    
+    elif item["kind"] == "attachmentActions":
+        # Card action (dropdown selection, button click)
+        action = event or webex_api.attachment_actions.get(item["id"])
+        card_handler.handle_action(action)
+
+
+def _dispatch_worker() -> None:
+    """Process queued webhook items until the process exits."""
+    while True:
+        item = DISPATCH_QUEUE.get()
+        try:
+            _process_event(item)
+        except Exception:
+            logger.exception("Error processing webhook %s %s", item['kind'], item['id'])
+        finally:
+            DISPATCH_QUEUE.task_done()
+
+
+def start_dispatch_workers() -> None:
+    """Start the dispatch worker threads (idempotent)."""
+    global _workers_started
+    if _workers_started:
+        return
+    
+    with _workers_lock:
+        if _workers_started:
+            return
+        
+        for i in range(DISPATCH_WORKERS):
+            threading.Thread(
+                target=_dispatch_worker,
+                name=f"webhook-dispatch-{i}",
+                daemon=True
+            ).start()
+        
+        _workers_started = True
+        logger.info("Started %s webhook dispatch workers", DISPATCH_WORKERS)
+
+
+def _delete_webhook(webhook):
+    """Delete a registered webhook and return it."""
+    webex_api.webhooks.delete(webhook.id)
+    return webhook
 
 
 @app.route("/webhooks/setup", methods=["POST"])
@@ -134,11 +339,14 @@ def setup_webhooks():
         return jsonify({"error": "target_url required"}), 400
     
     try:
-        # Delete existing webhooks
-        existing = webex_api.webhooks.list()
-        for webhook in existing:
-            webex_api.webhooks.delete(webhook.id)
-            logger.info(f"Deleted webhook: {webhook.name}")
+        # Delete existing webhooks in parallel
+        existing = list(webex_api.webhooks.list())
+        logger.info("Deleting %s existing webhooks", len(existing))
+        
+        if existing:
+            with ThreadPoolExecutor(max_workers=min(10, len(existing))) as executor:
+                for webhook in executor.map(_delete_webhook, existing):
+                    logger.info("Deleted webhook: %s", webhook.name)
         
         # Create new webhooks
         webhooks_created = []
@@ -169,19 +377,51 @@ def setup_webhooks():
         })
     
     except Exception as e:
-        logger.exception(f"Error setting up webhooks: {e}")
+        logger.exception("Error setting up webhooks")
         return jsonify({"error": str(e)}), 500
 
 
+def _run_gunicorn(port: int) -> None:
+    """Serve the app with an embedded gunicorn using threaded workers."""
+    from gunicorn.app.base import BaseApplication
+    
+    class _BotServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"0.0.0.0:{port}")
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("workers", int(os.getenv("BOT_WORKERS", max(2, (os.cpu_count() or 1) // 2))))
+            self.cfg.set("threads", int(os.getenv("BOT_THREADS", "32")))
+            self.cfg.set("worker_connections", 1000)
+            self.cfg.set("keepalive", 75)
+        
+        def load(self):
+            return app
+    
+    _BotServer().run()
+
+
 def main():
-    """Run the Flask application."""
+    """
+    Run the bot.
+    
+    Serves with gunicorn (gthread workers) unless DEBUG=true, in which case
+    the Flask development server is used. Equivalent command line:
+    
+        gunicorn -k gthread -w 2 --threads 32 --keep-alive 75 -b 0.0.0.0:5000 bot.app:app
+    """
     port = int(os.getenv("BOT_PORT", 5000))
     debug = os.getenv("DEBUG", "false").lower() == "true"
     
-    logger.info(f"Starting Pipeline Notify Bot on port {port}")
-    logger.info(f"Bot email: {bot_email}")
+    logger.info("Starting Pipeline Notify Bot on port %s", port)
+    logger.info("Bot email: %s", bot_email)
     
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    if debug:
+        start_dispatch_workers()
+        app.run(host="0.0.0.0", port=port, debug=debug)
+    else:
+        # Dispatch workers start lazily inside each gunicorn worker process;
+        # threads started here would not survive the fork.
+        _run_gunicorn(port)
 
 
 if __name__ == "__main__":
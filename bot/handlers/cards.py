@@ -8,16 +8,114 @@ Handles:
 - Card action submissions
 """
 
-import os
 import logging
 from typing import Dict, Any, List, Optional
 from webexteamssdk import WebexTeamsAPI
 
+import orjson
 import requests
 
+from bot.mcp_client import get_mcp_client
+from bot.webex_client import WebexMessenger
+
 logger = logging.getLogger(__name__)
 
 
+def _build_pipeline_selection_card(pipelines: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Build the pipeline selection Adaptive Card."""
+    return {
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "type": "AdaptiveCard",
+        "version": "1.3",
+        "body": [
+            {
+                "type": "TextBlock",
+                "text": "🚀 Start a Build",
+                "size": "Large",
+                "weight": "Bolder"
+            },
+            {
+                "type": "TextBlock",
+                "text": "Select the pipeline you want to build:",
+                "wrap": True
+            },
+            {
+                "type": "Input.ChoiceSet",
+                "id": "pipeline",
+                "style": "compact",
+                "isRequired": True,
+                "choices": [
+                    {"title": p["title"], "value": p["value"]}
+                    for p in pipelines
+                ]
+            }
+        ],
+        "actions": [
+            {
+                "type": "Action.Submit",
+                "title": "Next",
+                "data": {"action_type": "select_pipeline"}
+            },
+            {
+                "type": "Action.Submit",
+                "title": "Cancel",
+                "data": {"action_type": "cancel"}
+            }
+        ]
+    }
+
+
+def _build_branch_selection_card(pipeline: str, branches: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Build the branch selection Adaptive Card for a pipeline."""
+    return {
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "type": "AdaptiveCard",
+        "version": "1.3",
+        "body": [
+            {
+                "type": "TextBlock",
+                "text": f"🌿 Select Branch for {pipeline}",
+                "size": "Large",
+                "weight": "Bolder"
+            },
+            {
+                "type": "Input.ChoiceSet",
+                "id": "branch",
+                "style": "compact",
+                "isRequired": True,
+                "choices": [
+                    {"title": b["title"], "value": b["value"]}
+                    for b in branches
+                ]
+            }
+        ],
+        "actions": [
+            {
+                "type": "Action.Submit",
+                "title": "Next",
+                "data": {
+                    "action_type": "select_branch",
+                    "pipeline": pipeline
+                }
+            },
+            {
+                "type": "Action.Submit",
+                "title": "Cancel",
+                "data": {"action_type": "cancel"}
+            }
+        ]
+    }
+
+
+def _encode_card_message_tail(text: str, card: Dict[str, Any]) -> bytes:
+    """Pre-encode a card message's JSON after the roomId field."""
+    message = {
+        "text": text,
+        "attachments": [{"contentType": WebexMessenger.CARD_CONTENT_TYPE, "content": card}]
+    }
+    return b"," + orjson.dumps(message)[1:]
+
+
 class CardHandler:
     """Handles Webex Adaptive Card creation and action processing."""
     
@@ -40,15 +138,37 @@ class CardHandler:
         ],
     }
     
-    def __init__(self, webex_api: WebexTeamsAPI):
+    # Static card messages, pre-encoded once from the tables above. Bytes
+    # cannot be mutated, so the shared copies cannot be corrupted by a caller.
+    _PIPELINE_CARD_TAIL = _encode_card_message_tail(
+        "Select a pipeline to build", _build_pipeline_selection_card(PIPELINES)
+    )
+    _BRANCH_CARD_TAILS = {
+        pipeline: _encode_card_message_tail(
+            f"Select a branch for {pipeline}", _build_branch_selection_card(pipeline, branches)
+        )
+        for pipeline, branches in BRANCHES.items()
+    }
+    
+    def __init__(self, webex_api: WebexTeamsAPI, messenger: Optional[WebexMessenger] = None):
         """
         Initialize card handler.
         
         Args:
             webex_api: Webex Teams API client
+            messenger: Pooled Webex messenger (defaults to one using the API token)
         """
         self.webex = webex_api
-        self.mcp_server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8080")
+        self.messenger = messenger or WebexMessenger(webex_api.access_token)
+        self.mcp = get_mcp_client()
+        
+        # Card actions keyed by the submitted action_type
+        self._actions = {
+            "select_pipeline": self._handle_pipeline_selection,
+            "select_branch": self._handle_branch_selection,
+            "confirm_build": self._handle_build_confirmation,
+            "cancel": self._handle_cancel,
+        }
     
     def handle_action(self, action) -> Dict[str, Any]:
         """
@@ -65,20 +185,19 @@ class CardHandler:
         room_id = action.roomId
         person_email = action.personEmail
         
-        logger.info(f"Processing card action from {person_email}: {action_type}")
+        logger.info("Processing card action from %s: %s", person_email, action_type)
         
-        if action_type == "select_pipeline":
-            return self._handle_pipeline_selection(room_id, inputs)
-        elif action_type == "select_branch":
-            return self._handle_branch_selection(room_id, inputs)
-        elif action_type == "confirm_build":
-            return self._handle_build_confirmation(room_id, inputs)
-        elif action_type == "cancel":
-            self._send_message(room_id, "❌ Build cancelled.")
-            return {"status": "cancelled"}
-        else:
+        handler = self._actions.get(action_type)
+        if handler is None:
             self._send_message(room_id, "Unknown card action.")
             return {"status": "unknown_action", "action_type": action_type}
+        
+        return handler(room_id, inputs)
+    
+    def _handle_cancel(self, room_id: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a cancelled build flow."""
+        self._send_message(room_id, "❌ Build cancelled.")
+        return {"status": "cancelled"}
     
     def _handle_pipeline_selection(self, room_id: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,16 +217,7 @@ class CardHandler:
             return {"status": "error", "message": "No pipeline selected"}
         
         # Send branch selection card
-        card = self.create_branch_selection_card(pipeline)
-        
-        self.webex.messages.create(
-            roomId=room_id,
-            text=f"Select a branch for {pipeline}",
-            attachments=[{
-                "contentType": "application/vnd.microsoft.card.adaptive",
-                "content": card
-            }]
-        )
+        self.messenger.send_json(self.branch_selection_message(room_id, pipeline))
         
         return {"status": "branch_card_sent", "pipeline": pipeline}
     
@@ -132,14 +242,7 @@ class CardHandler:
         # Send confirmation card
         card = self.create_build_confirmation_card(pipeline, branch)
         
-        self.webex.messages.create(
-            roomId=room_id,
-            text=f"Confirm build: {pipeline} on {branch}",
-            attachments=[{
-                "contentType": "application/vnd.microsoft.card.adaptive",
-                "content": card
-            }]
-        )
+        self.messenger.send_card(room_id, f"Confirm build: {pipeline} on {branch}", card)
         
         return {"status": "confirmation_card_sent", "pipeline": pipeline, "branch": branch}
     
@@ -163,88 +266,71 @@ class CardHandler:
         
         # Call MCP server to trigger build
         try:
-            payload = {
-                "tool": "start_build",
-                "args": {
-                    "pipeline": pipeline,
-                    "branch": branch
-                }
-            }
-            
-            response = requests.post(
-                f"{self.mcp_server_url}/tools/execute",
-                json=payload,
-                timeout=30
+            data = self.mcp.call("start_build", {
+                "pipeline": pipeline,
+                "branch": branch
+            })
+            build_number = data.get("build_number", "N/A")
+            self._send_message(
+                room_id,
+                f"✅ **Build triggered successfully!**\n\n"
+                f"• **Pipeline:** {pipeline}\n"
+                f"• **Branch:** {branch}\n"
+                f"• **Build #:** {build_number}"
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                build_number = data.get("build_number", "N/A")
-                self._send_message(
-                    room_id,
-                    f"✅ **Build triggered successfully!**\n\n"
-                    f"• **Pipeline:** {pipeline}\n"
-                    f"• **Branch:** {branch}\n"
-                    f"• **Build #:** {build_number}"
-                )
-                return {"status": "build_triggered", "build_number": build_number}
-            else:
-                self._send_message(room_id, f"❌ Error triggering build: HTTP {response.status_code}")
-                return {"status": "error", "http_status": response.status_code}
+            return {"status": "build_triggered", "build_number": build_number}
+        
+        except requests.HTTPError as e:
+            status_code = e.response.status_code
+            self._send_message(room_id, f"❌ Error triggering build: HTTP {status_code}")
+            return {"status": "error", "http_status": status_code}
         
         except requests.RequestException as e:
-            logger.error(f"Error calling MCP server: {e}")
+            logger.error("Error calling MCP server: %s", e)
             self._send_message(room_id, f"❌ Error connecting to MCP server: {e}")
             return {"status": "error", "exception": str(e)}
     
+    @staticmethod
+    def pipeline_selection_message(room_id: str) -> bytes:
+        """
+        Encode the pipeline selection card message for a room.
+        
+        Args:
+            room_id: Webex room ID
+        
+        Returns:
+            JSON message body for WebexMessenger.send_json
+        """
+        return b'{"roomId":' + orjson.dumps(room_id) + CardHandler._PIPELINE_CARD_TAIL
+    
+    @staticmethod
+    def branch_selection_message(room_id: str, pipeline: str) -> bytes:
+        """
+        Encode the branch selection card message for a room.
+        
+        Args:
+            room_id: Webex room ID
+            pipeline: Selected pipeline name
+        
+        Returns:
+            JSON message body for WebexMessenger.send_json
+        """
+        tail = CardHandler._BRANCH_CARD_TAILS.get(pipeline)
+        if tail is None:
+            tail = _encode_card_message_tail(
+                f"Select a branch for {pipeline}", _build_branch_selection_card(pipeline, [])
+            )
+        return b'{"roomId":' + orjson.dumps(room_id) + tail
+    
     @staticmethod
     def create_pipeline_selection_card() -> Dict[str, Any]:
         """
         Create a pipeline selection card.
         
         Returns:
-            Adaptive Card JSON
+            Adaptive Card JSON (a new dict on every call)
         """
-        return {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.3",
-            "body": [
-                {
-                    "type": "TextBlock",
-                    "text": "🚀 Start a Build",
-                    "size": "Large",
-                    "weight": "Bolder"
-                },
-                {
-                    "type": "TextBlock",
-                    "text": "Select the pipeline you want to build:",
-                    "wrap": True
-                },
-                {
-                    "type": "Input.ChoiceSet",
-                    "id": "pipeline",
-                    "style": "compact",
-                    "isRequired": True,
-                    "choices": [
-                        {"title": p["title"], "value": p["value"]}
-                        for p in CardHandler.PIPELINES
-                    ]
-                }
-            ],
-            "actions": [
-                {
-                    "type": "Action.Submit",
-                    "title": "Next",
-                    "data": {"action_type": "select_pipeline"}
-                },
-                {
-                    "type": "Action.Submit",
-                    "title": "Cancel",
-                    "data": {"action_type": "cancel"}
-                }
-            ]
-        }
+        return _build_pipeline_selection_card(CardHandler.PIPELINES)
     
     @staticmethod
     def create_branch_selection_card(pipeline: str) -> Dict[str, Any]:
@@ -255,48 +341,9 @@ class CardHandler:
             pipeline: Selected pipeline name
             
         Returns:
-            Adaptive Card JSON
+            Adaptive Card JSON (a new dict on every call)
         """
-        branches = CardHandler.BRANCHES.get(pipeline, [])
-        
-        return {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.3",
-            "body": [
-                {
-                    "type": "TextBlock",
-                    "text": f"🌿 Select Branch for {pipeline}",
-                    "size": "Large",
-                    "weight": "Bolder"
-                },
-                {
-                    "type": "Input.ChoiceSet",
-                    "id": "branch",
-                    "style": "compact",
-                    "isRequired": True,
-                    "choices": [
-                        {"title": b["title"], "value": b["value"]}
-                        for b in branches
-                    ]
-                }
-            ],
-            "actions": [
-                {
-                    "type": "Action.Submit",
-                    "title": "Next",
-                    "data": {
-                        "action_type": "select_branch",
-                        "pipeline": pipeline
-                    }
-                },
-                {
-                    "type": "Action.Submit",
-                    "title": "Cancel",
-                    "data": {"action_type": "cancel"}
-                }
-            ]
-        }
+        return _build_branch_selection_card(pipeline, CardHandler.BRANCHES.get(pipeline, []))
     
     @staticmethod
     def create_build_confirmation_card(pipeline: str, branch: str) -> Dict[str, Any]:
@@ -357,9 +404,6 @@ class CardHandler:
     def _send_message(self, room_id: str, text: str) -> None:
         """Send a markdown message to a room."""
         try:
-            self.webex.messages.create(
-                roomId=room_id,
-                markdown=text
-            )
+            self.messenger.send(room_id, markdown=text)
         except Exception as e:
-            logger.error(f"Error sending message: {e}")
+            logger.error("Error sending message: %s", e)
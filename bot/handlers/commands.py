@@ -11,51 +11,121 @@ Supported commands:
 """
 
 import re
-import os
 import logging
 from typing import Optional, Dict, Any
 from webexteamssdk import WebexTeamsAPI
 
+import orjson
 import requests
 
+from bot.mcp_client import get_mcp_client
+from bot.webex_client import WebexMessenger
+
 logger = logging.getLogger(__name__)
 
+HELP_TEXT = """
+**🔧 Pipeline Notify Bot - Available Commands**
+
+**Commands:**
+• `/metrics FXOS [build_number]` - Get FXOS build metrics
+• `/metrics ASA [build_number]` - Get ASA build metrics
+• `/query <branch>` - Query branch status (cairo, fxos_19, fxos_18)
+• `/build` - Start a new build (with dropdown selection)
+• `/repackage` - Trigger repackage operation
+• `/help` - Show this help message
+
+**Natural Language:**
+• "Is Cairo passing?" - Check branch status
+• "Get metrics for FXOS" - Show build metrics
+
+**Examples:**
+• `/metrics FXOS 11068` - Metrics for specific build
+• `/query cairo` - Check Cairo branch status
+"""
+
+UNKNOWN_COMMAND_TEXT = (
+    "I didn't understand that command. "
+    "Type `/help` to see available commands."
+)
+
+# Static replies with their message JSON pre-encoded after the roomId field
+_STATIC_REPLY_BODIES = tuple(
+    (text, b',"markdown":' + orjson.dumps(text) + b'}')
+    for text in (HELP_TEXT, UNKNOWN_COMMAND_TEXT)
+)
+
 
 class CommandHandler:
     """Handles text commands from Webex messages."""
     
+    # Pattern sources, shared by the single-command patterns and the fused
+    # dispatch patterns so the two can never drift apart
+    _METRICS_SRC = r"/metrics\s+(?P<metrics_job>fxos|asa)(?:\s+(?P<metrics_build>\d+))?"
+    _QUERY_SRC = r"/query\s+(?P<query_branch>\w+)"
+    _NL_STATUS_SRC = r"(?:is|how is|what'?s?)\s+(?P<status_branch>\w+)\s+(?:passing|doing|status|failing)"
+    _NL_METRICS_SRC = r"(?:get|show|display)\s+metrics?\s+(?:for\s+)?(?P<metrics_target>\w+)"
+    
     # Command patterns
-    METRICS_PATTERN = re.compile(
-        r"^/metrics\s+(fxos|asa)(?:\s+(\d+))?$",
-        re.IGNORECASE
-    )
-    QUERY_PATTERN = re.compile(
-        r"^/query\s+(\w+)$",
-        re.IGNORECASE
-    )
+    METRICS_PATTERN = re.compile(rf"^{_METRICS_SRC}$", re.IGNORECASE)
+    QUERY_PATTERN = re.compile(rf"^{_QUERY_SRC}$", re.IGNORECASE)
     BUILD_PATTERN = re.compile(r"^/build$", re.IGNORECASE)
     REPACKAGE_PATTERN = re.compile(r"^/repackage$", re.IGNORECASE)
     HELP_PATTERN = re.compile(r"^/help$", re.IGNORECASE)
     
     # Natural language patterns
-    NL_STATUS_PATTERN = re.compile(
-        r"(?:is|how is|what'?s?)\s+(\w+)\s+(?:passing|doing|status|failing)",
-        re.IGNORECASE
-    )
-    NL_METRICS_PATTERN = re.compile(
-        r"(?:get|show|display)\s+metrics?\s+(?:for\s+)?(\w+)",
+    NL_STATUS_PATTERN = re.compile(_NL_STATUS_SRC, re.IGNORECASE)
+    NL_METRICS_PATTERN = re.compile(_NL_METRICS_SRC, re.IGNORECASE)
+    
+    # Fused slash-command pattern so a message is scanned once; dispatch on
+    # the outer group name (match.lastgroup). The natural language patterns
+    # stay separate: a status question takes precedence over a metrics
+    # request anywhere in the message, which a leftmost-match fusion loses.
+    COMMAND_PATTERN = re.compile(
+        r"^(?:"
+        rf"(?P<metrics>{_METRICS_SRC})"
+        rf"|(?P<query>{_QUERY_SRC})"
+        r"|(?P<build>/build)"
+        r"|(?P<repackage>/repackage)"
+        r"|(?P<help>/help)"
+        r")$",
         re.IGNORECASE
     )
     
-    def __init__(self, webex_api: WebexTeamsAPI):
+    # Canonical job types and branches, keyed by the spellings users type.
+    # Unknown branches still go to MCP, which owns the branch list.
+    JOB_TYPES = {
+        "fxos": "FXOS", "FXOS": "FXOS", "Fxos": "FXOS",
+        "asa": "ASA", "ASA": "ASA", "Asa": "ASA",
+    }
+    BRANCHES = {b: b for b in ("cairo", "lina", "fxos_19", "fxos_18")}
+    
+    # MCP result cache lifetimes (seconds)
+    QUERY_TTL = 15
+    METRICS_TTL = 60
+    BUILD_METRICS_TTL = 86400  # A finished build's metrics never change
+    
+    def __init__(self, webex_api: WebexTeamsAPI, messenger: Optional[WebexMessenger] = None):
         """
         Initialize command handler.
         
         Args:
             webex_api: Webex Teams API client
+            messenger: Pooled Webex messenger (defaults to one using the API token)
         """
         self.webex = webex_api
-        self.mcp_server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8080")
+        self.messenger = messenger or WebexMessenger(webex_api.access_token)
+        self.mcp = get_mcp_client()
+        
+        # Slash commands keyed by COMMAND_PATTERN group name. Each takes
+        # (room_id, match) and returns reply text, or a result dict if it
+        # already replied.
+        self._commands = {
+            "metrics": self._command_metrics,
+            "query": self._command_query,
+            "build": self._command_build,
+            "repackage": self._command_repackage,
+            "help": self._command_help,
+        }
     
     def handle_message(self, message) -> Dict[str, Any]:
         """
@@ -71,64 +141,76 @@ class CommandHandler:
         room_id = message.roomId
         person_email = message.personEmail
         
-        logger.info(f"Processing message from {person_email}: {text[:50]}...")
+        logger.info("Processing message from %s: %.50s...", person_email, text)
         
-        # Try to match commands
         response_text = None
         
-        # /metrics command
-        match = self.METRICS_PATTERN.match(text)
+        match = self.COMMAND_PATTERN.match(text)
         if match:
-            job_type = match.group(1).upper()
-            build_number = int(match.group(2)) if match.group(2) else None
-            response_text = self._handle_metrics(job_type, build_number)
-        
-        # /query command
-        if not response_text:
-            match = self.QUERY_PATTERN.match(text)
-            if match:
-                branch = match.group(1)
-                response_text = self._handle_query(branch)
-        
-        # /build command
-        if not response_text and self.BUILD_PATTERN.match(text):
-            return self._send_build_card(room_id)
-        
-        # /repackage command
-        if not response_text and self.REPACKAGE_PATTERN.match(text):
-            response_text = self._handle_repackage()
-        
-        # /help command
-        if not response_text and self.HELP_PATTERN.match(text):
-            response_text = self._get_help_text()
+            result = self._commands[match.lastgroup](room_id, match)
+            if isinstance(result, dict):
+                return result
+            response_text = result
         
         # Natural language: "Is Cairo passing?"
         if not response_text:
             match = self.NL_STATUS_PATTERN.search(text)
             if match:
-                branch = match.group(1)
-                response_text = self._handle_query(branch)
+                response_text = self._handle_query(match.group("status_branch"))
         
         # Natural language: "Get metrics for FXOS"
         if not response_text:
             match = self.NL_METRICS_PATTERN.search(text)
             if match:
-                job_type = match.group(1).upper()
-                if job_type in ("FXOS", "ASA"):
+                job_type = self._canonical_job_type(match.group("metrics_target"))
+                if job_type:
                     response_text = self._handle_metrics(job_type)
         
         # Default: unknown command
         if not response_text:
-            response_text = (
-                "I didn't understand that command. "
-                "Type `/help` to see available commands."
-            )
+            response_text = UNKNOWN_COMMAND_TEXT
         
         # Send response
         self._send_message(room_id, response_text)
         
         return {"status": "sent", "room_id": room_id}
     
+    def _command_metrics(self, room_id: str, match: re.Match) -> str:
+        """Run /metrics <job> [build]."""
+        build = match.group("metrics_build")
+        return self._handle_metrics(
+            self._canonical_job_type(match.group("metrics_job")),
+            int(build) if build else None
+        )
+    
+    def _command_query(self, room_id: str, match: re.Match) -> str:
+        """Run /query <branch>."""
+        return self._handle_query(match.group("query_branch"))
+    
+    def _command_build(self, room_id: str, match: re.Match) -> Dict[str, Any]:
+        """Run /build - replies with the pipeline card."""
+        return self._send_build_card(room_id)
+    
+    def _command_repackage(self, room_id: str, match: re.Match) -> str:
+        """Run /repackage."""
+        return self._handle_repackage()
+    
+    def _command_help(self, room_id: str, match: re.Match) -> str:
+        """Run /help."""
+        return self._get_help_text()
+    
+    def _canonical_job_type(self, raw: str) -> Optional[str]:
+        """Map a typed job type to FXOS/ASA, or None if unknown."""
+        return self.JOB_TYPES.get(raw) or self.JOB_TYPES.get(raw.lower())
+    
+    def _canonical_branch(self, raw: str) -> str:
+        """Map a typed branch name to its canonical lowercase form."""
+        branch = self.BRANCHES.get(raw)
+        if branch is None:
+            lowered = raw.lower()
+            branch = self.BRANCHES.get(lowered, lowered)
+        return branch
+    
     def _handle_metrics(self, job_type: str, build_number: Optional[int] = None) -> str:
         """
         Get Jenkins build metrics.
@@ -140,29 +222,20 @@ class CommandHandler:
         Returns:
             Formatted metrics response
         """
+        ttl = self.BUILD_METRICS_TTL if build_number is not None else self.METRICS_TTL
+        
         try:
-            payload = {
-                "tool": "get_metrics",
-                "args": {
-                    "job_type": job_type,
-                    "build_number": build_number
-                }
-            }
-            
-            response = requests.post(
-                f"{self.mcp_server_url}/tools/execute",
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("formatted_output", "No metrics available")
-            else:
-                return f"❌ Error fetching metrics: HTTP {response.status_code}"
+            data = self.mcp.call("get_metrics", {
+                "job_type": job_type,
+                "build_number": build_number
+            }, ttl=ttl)
+            return data.get("formatted_output", "No metrics available")
+        
+        except requests.HTTPError as e:
+            return f"❌ Error fetching metrics: HTTP {e.response.status_code}"
         
         except requests.RequestException as e:
-            logger.error(f"Error calling MCP server: {e}")
+            logger.error("Error calling MCP server: %s", e)
             return f"❌ Error connecting to MCP server: {e}"
     
     def _handle_query(self, branch: str) -> str:
@@ -176,50 +249,31 @@ class CommandHandler:
             Formatted branch status
         """
         try:
-            payload = {
-                "tool": "query_branch",
-                "args": {
-                    "branch": branch.lower()
-                }
-            }
-            
-            response = requests.post(
-                f"{self.mcp_server_url}/tools/execute",
-                json=payload,
-                timeout=30
+            data = self.mcp.call(
+                "query_branch",
+                {"branch": self._canonical_branch(branch)},
+                ttl=self.QUERY_TTL
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("formatted_output", "No data available")
-            else:
-                return f"❌ Error querying branch: HTTP {response.status_code}"
+            return data.get("formatted_output", "No data available")
+        
+        except requests.HTTPError as e:
+            return f"❌ Error querying branch: HTTP {e.response.status_code}"
         
         except requests.RequestException as e:
-            logger.error(f"Error calling MCP server: {e}")
+            logger.error("Error calling MCP server: %s", e)
             return f"❌ Error connecting to MCP server: {e}"
     
     def _handle_repackage(self) -> str:
         """Trigger repackage operation."""
         try:
-            payload = {
-                "tool": "repackage",
-                "args": {}
-            }
-            
-            response = requests.post(
-                f"{self.mcp_server_url}/tools/execute",
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return "✅ Repackage operation triggered successfully"
-            else:
-                return f"❌ Error triggering repackage: HTTP {response.status_code}"
+            self.mcp.call("repackage", {})
+            return "✅ Repackage operation triggered successfully"
+        
+        except requests.HTTPError as e:
+            return f"❌ Error triggering repackage: HTTP {e.response.status_code}"
         
         except requests.RequestException as e:
-            logger.error(f"Error calling MCP server: {e}")
+            logger.error("Error calling MCP server: %s", e)
             return f"❌ Error connecting to MCP server: {e}"
     
     def _send_build_card(self, room_id: str) -> Dict[str, Any]:
@@ -234,47 +288,21 @@ class CommandHandler:
         """
         from bot.handlers.cards import CardHandler
         
-        card = CardHandler.create_pipeline_selection_card()
-        
-        self.webex.messages.create(
-            roomId=room_id,
-            text="Select a pipeline to build",  # Fallback text
-            attachments=[{
-                "contentType": "application/vnd.microsoft.card.adaptive",
-                "content": card
-            }]
-        )
+        self.messenger.send_json(CardHandler.pipeline_selection_message(room_id))
         
         return {"status": "card_sent", "room_id": room_id, "card": "pipeline_selection"}
     
     def _get_help_text(self) -> str:
         """Get help text with available commands."""
-        return """
-**🔧 Pipeline Notify Bot - Available Commands**
-
-**Commands:**
-• `/metrics FXOS [build_number]` - Get FXOS build metrics
-• `/metrics ASA [build_number]` - Get ASA build metrics
-• `/query <branch>` - Query branch status (cairo, fxos_19, fxos_18)
-• `/build` - Start a new build (with dropdown selection)
-• `/repackage` - Trigger repackage operation
-• `/help` - Show this help message
-
-**Natural Language:**
-• "Is Cairo passing?" - Check branch status
-• "Get metrics for FXOS" - Show build metrics
-
-**Examples:**
-• `/metrics FXOS 11068` - Metrics for specific build
-• `/query cairo` - Check Cairo branch status
-"""
+        return HELP_TEXT
     
     def _send_message(self, room_id: str, text: str) -> None:
         """Send a markdown message to a room."""
         try:
-            self.webex.messages.create(
-                roomId=room_id,
-                markdown=text
-            )
+            for static_text, body_tail in _STATIC_REPLY_BODIES:
+                if text is static_text:
+                    self.messenger.send_json(b'{"roomId":' + orjson.dumps(room_id) + body_tail)
+                    return
+            self.messenger.send(room_id, markdown=text)
         except Exception as e:
-            logger.error(f"Error sending message: {e}")
+            logger.error("Error sending message: %s", e)
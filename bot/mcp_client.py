@@ -0,0 +1,170 @@
+"""
+MCP Client - HTTP access to the Pipeline Notify MCP orchestrator.
+
+All bot handlers call MCP tools through a single shared client so that
+connections to the orchestrator are pooled and kept alive across
+webhook requests instead of being re-established per command.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from cachetools import TLRUCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class MCPClient:
+    """Client for executing tools on the MCP orchestrator."""
+    
+    def __init__(self, base_url: Optional[str] = None, timeout: int = 30):
+        """
+        Initialize MCP client.
+        
+        Args:
+            base_url: MCP server URL (falls back to env)
+            timeout: Request timeout in seconds
+        """
+        base_url = base_url or os.getenv("MCP_SERVER_URL", "http://localhost:8080")
+        self.execute_url = f"{base_url.rstrip('/')}/tools/execute"
+        self.timeout = timeout
+        
+        self._session = None
+        self._session_lock = threading.Lock()
+        
+        # Cached results of idempotent tool calls; each entry carries its own TTL
+        self._cache: TLRUCache = TLRUCache(maxsize=512, ttu=self._expires_at)
+        self._cache_lock = threading.Lock()
+        
+        # Calls currently in progress, so concurrent identical calls share one POST
+        self._inflight: Dict[Tuple, Future] = {}
+    
+    @property
+    def session(self) -> requests.Session:
+        """Get the pooled requests session."""
+        if self._session is not None:
+            return self._session
+        
+        # Dispatch workers and request threads share this client: only one
+        # may create the session, or each would end up with its own pool
+        with self._session_lock:
+            if self._session is None:
+                # POST is not in Retry's default allowed_methods, so only
+                # connection failures are retried - a tool is never re-run.
+                adapter = HTTPAdapter(
+                    pool_connections=10,
+                    pool_maxsize=50,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.1,
+                        status_forcelist=(502, 503, 504)
+                    )
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Accept": "application/json"})
+                self._session = session
+        return self._session
+    
+    def call(self, tool: str, args: Dict[str, Any], ttl: float = 0) -> Dict[str, Any]:
+        """
+        Execute an MCP tool.
+        
+        Args:
+            tool: Tool name (e.g., get_metrics, query_branch)
+            args: Tool arguments
+            ttl: Seconds to reuse a successful result (0 disables caching).
+                Concurrent identical cached calls also share one request.
+        
+        Returns:
+            Decoded tool result
+        
+        Raises:
+            requests.HTTPError: If the MCP server does not return HTTP 200
+            requests.RequestException: If the MCP server is unreachable
+        """
+        if ttl <= 0:
+            return self._execute(tool, args)
+        
+        key = (tool, tuple(sorted(args.items())))
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                return entry[1]
+            
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        if not leader:
+            # The leader's request is bounded by the HTTP timeout
+            return future.result()
+        
+        try:
+            data = self._execute(tool, args)
+        except BaseException as e:
+            with self._cache_lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        
+        with self._cache_lock:
+            del self._inflight[key]
+            if self._is_cacheable(data):
+                self._cache[key] = (ttl, data)
+        
+        future.set_result(data)
+        return data
+    
+    def _execute(self, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a tool call to the MCP server."""
+        response = self.session.post(
+            self.execute_url,
+            json={"tool": tool, "args": args},
+            timeout=self.timeout
+        )
+        
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        
+        return response.json()
+    
+    @staticmethod
+    def _expires_at(key: Any, value: Tuple[float, Dict[str, Any]], now: float) -> float:
+        """Expiry time for a cache entry stored as (ttl, data)."""
+        return now + value[0]
+    
+    @staticmethod
+    def _is_cacheable(data: Dict[str, Any]) -> bool:
+        """
+        Only cache complete results - not tool errors or partial metrics.
+        
+        A metrics row without a duration belongs to a build that has not
+        finished (no end marker yet), so it must not be cached either.
+        """
+        if data.get("error"):
+            return False
+        return not any(
+            row.get("errors") or not row.get("duration_mmss")
+            for row in data.get("rows", ())
+        )
+
+
+# Shared instance
+_mcp_client: Optional[MCPClient] = None
+
+
+def get_mcp_client() -> MCPClient:
+    """Get the shared MCP client."""
+    global _mcp_client
+    if _mcp_client is None:
+        _mcp_client = MCPClient()
+    return _mcp_client
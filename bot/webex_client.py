@@ -0,0 +1,140 @@
+"""
+Webex Messenger - Pooled HTTP access to the Webex messages API.
+
+Replies and cards are the bot's most frequent outbound calls, so they are
+posted over one shared keep-alive session instead of going through
+webexteamssdk for every message. The SDK is still used for everything
+that needs its object model (fetching messages, webhooks, people).
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class WebexMessenger:
+    """Sends messages and Adaptive Cards to Webex rooms."""
+    
+    MESSAGES_URL = "https://webexapis.com/v1/messages"
+    CARD_CONTENT_TYPE = "application/vnd.microsoft.card.adaptive"
+    
+    def __init__(self, access_token: str, timeout: int = 10):
+        """
+        Initialize Webex messenger.
+        
+        Args:
+            access_token: Webex bot access token
+            timeout: Request timeout in seconds
+        """
+        self.access_token = access_token
+        self.timeout = timeout
+        
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> requests.Session:
+        """Get the pooled, authenticated requests session."""
+        if self._session is not None:
+            return self._session
+        
+        # Dispatch workers and request threads share this messenger: only
+        # one may create the session, or each would end up with its own pool
+        with self._session_lock:
+            if self._session is None:
+                # Retry rate limits (honouring Retry-After) and connect failures;
+                # read errors are not retried so a message is never posted twice.
+                adapter = HTTPAdapter(
+                    pool_maxsize=50,
+                    max_retries=Retry(
+                        total=3,
+                        read=0,
+                        backoff_factor=0.5,
+                        status_forcelist=(429,),
+                        allowed_methods=frozenset({"POST"}),
+                        raise_on_status=False
+                    )
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "Authorization": f"Bearer {self.access_token}",
+                    "Content-Type": "application/json"
+                })
+                self._session = session
+        return self._session
+    
+    def send(
+        self,
+        room_id: str,
+        markdown: Optional[str] = None,
+        text: Optional[str] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Post a message to a room.
+        
+        Args:
+            room_id: Webex room ID
+            markdown: Markdown message body
+            text: Plain text body (card fallback text)
+            attachments: Message attachments
+        
+        Returns:
+            Created message
+        
+        Raises:
+            requests.RequestException: If Webex rejects the message or is unreachable
+        """
+        payload: Dict[str, Any] = {"roomId": room_id}
+        if markdown is not None:
+            payload["markdown"] = markdown
+        if text is not None:
+            payload["text"] = text
+        if attachments:
+            payload["attachments"] = attachments
+        
+        response = self.session.post(self.MESSAGES_URL, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    def send_json(self, body: bytes) -> Dict[str, Any]:
+        """
+        Post a pre-encoded message body.
+        
+        Args:
+            body: JSON-encoded message (must include roomId)
+        
+        Returns:
+            Created message
+        
+        Raises:
+            requests.RequestException: If Webex rejects the message or is unreachable
+        """
+        response = self.session.post(self.MESSAGES_URL, data=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    def send_card(self, room_id: str, text: str, card: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Post an Adaptive Card to a room.
+        
+        Args:
+            room_id: Webex room ID
+            text: Fallback text for clients that cannot render cards
+            card: Adaptive Card JSON
+        
+        Returns:
+            Created message
+        """
+        return self.send(
+            room_id,
+            text=text,
+            attachments=[{"contentType": self.CARD_CONTENT_TYPE, "content": card}]
+        )
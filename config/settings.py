@@ -15,20 +15,86 @@ Usage:
 """
 
 import os
+import functools
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
 
-import yaml
-from dotenv import load_dotenv
 
+# yaml and dotenv are imported lazily: paths that only need env values
+# should not pay their import cost.
+DEFAULT_DOTENV_PATH = Path(__file__).resolve().parent.parent / ".env"
 
-# Load .env file
-load_dotenv()
+
+@functools.lru_cache(maxsize=4)
+def _loaded_dotenv(path: str, mtime: float) -> bool:
+    """Merge a .env file into os.environ, once per path and modification time."""
+    from dotenv import load_dotenv
+    return load_dotenv(path, override=False)
+
+
+def ensure_env_loaded(path: Optional[Path] = None) -> None:
+    """
+    Load the .env file into os.environ if it has not been loaded yet.
+    
+    Idempotent: the file is only re-read when its modification time changes,
+    and values already present in the environment are never overridden.
+    
+    Args:
+        path: .env file path (defaults to the project root .env)
+    """
+    path = path or DEFAULT_DOTENV_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return
+    _loaded_dotenv(str(path), mtime)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse a YAML file, memoized by path and modification time.
+    
+    The parsed dict is shared by every Settings instance and must not be mutated.
+    """
+    import yaml
+    
+    # C-accelerated loader when PyYAML was built with libyaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path) as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+class _EnvSettings:
+    """Base for settings sections bound to environment variables."""
+    
+    # Field name -> environment variable
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {}
+    
+    @classmethod
+    def from_env(cls):
+        """Load from environment variables, coerced to each field's default type."""
+        environ = os.environ
+        values: Dict[str, Any] = {}
+        for name, key in cls._ENV_KEYS.items():
+            raw = environ.get(key)
+            if raw is None:
+                continue
+            default = getattr(cls, name)
+            if isinstance(default, bool):
+                values[name] = raw.lower() == "true"
+            elif isinstance(default, int):
+                values[name] = int(raw)
+            else:
+                values[name] = raw
+        return cls(**values)
 
 
 @dataclass
-class JenkinsSettings:
+class JenkinsSettings(_EnvSettings):
     """Jenkins configuration."""
     base_url: str = ""
     user: str = ""
@@ -36,82 +102,75 @@ class JenkinsSettings:
     job_path_fxos_pb: str = ""
     job_path_asa: str = ""
     
-    @classmethod
-    def from_env(cls) -> "JenkinsSettings":
-        """Load from environment variables."""
-        return cls(
-            base_url=os.getenv("JENKINS_BASE_URL", ""),
-            user=os.getenv("JENKINS_USER", ""),
-            api_token=os.getenv("JENKINS_API_TOKEN", ""),
-            job_path_fxos_pb=os.getenv("JENKINS_JOB_PATH_FXOS_PB", ""),
-            job_path_asa=os.getenv("JENKINS_JOB_PATH_ASA", "")
-        )
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {
+        "base_url": "JENKINS_BASE_URL",
+        "user": "JENKINS_USER",
+        "api_token": "JENKINS_API_TOKEN",
+        "job_path_fxos_pb": "JENKINS_JOB_PATH_FXOS_PB",
+        "job_path_asa": "JENKINS_JOB_PATH_ASA",
+    }
 
 
 @dataclass
-class SplunkSettings:
+class SplunkSettings(_EnvSettings):
     """Splunk configuration."""
     host: str = ""
     token: str = ""
+    ca_bundle: str = ""
+    hec_url: str = ""
+    hec_token: str = ""
     
-    @classmethod
-    def from_env(cls) -> "SplunkSettings":
-        """Load from environment variables."""
-        return cls(
-            host=os.getenv("SPLUNK_HOST", ""),
-            token=os.getenv("SPLUNK_TOKEN", "")
-        )
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {
+        "host": "SPLUNK_HOST",
+        "token": "SPLUNK_TOKEN",
+        "ca_bundle": "SPLUNK_CA_BUNDLE",
+        "hec_url": "SPLUNK_HEC_URL",
+        "hec_token": "SPLUNK_HEC_TOKEN",
+    }
 
 
 @dataclass
-class SwarmSettings:
+class SwarmSettings(_EnvSettings):
     """Swarm configuration."""
     base_url: str = ""
     api_token: str = ""
     
-    @classmethod
-    def from_env(cls) -> "SwarmSettings":
-        """Load from environment variables."""
-        return cls(
-            base_url=os.getenv("SWARM_BASE_URL", ""),
-            api_token=os.getenv("SWARM_API_TOKEN", "")
-        )
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {
+        "base_url": "SWARM_BASE_URL",
+        "api_token": "SWARM_API_TOKEN",
+    }
 
 
 @dataclass
-class WebexSettings:
+class WebexSettings(_EnvSettings):
     """Webex Bot configuration."""
     bot_token: str = ""
     webhook_secret: str = ""
     bot_email: str = ""
     
-    @classmethod
-    def from_env(cls) -> "WebexSettings":
-        """Load from environment variables."""
-        return cls(
-            bot_token=os.getenv("WEBEX_BOT_TOKEN", ""),
-            webhook_secret=os.getenv("WEBEX_WEBHOOK_SECRET", ""),
-            bot_email=os.getenv("WEBEX_BOT_EMAIL", "")
-        )
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {
+        "bot_token": "WEBEX_BOT_TOKEN",
+        "webhook_secret": "WEBEX_WEBHOOK_SECRET",
+        "bot_email": "WEBEX_BOT_EMAIL",
+    }
 
 
 @dataclass
-class ServerSettings:
+class ServerSettings(_EnvSettings):
     """Server configuration."""
     bot_port: int = 5000
     mcp_server_port: int = 8080
+    mcp_server_threads: int = 16
     debug: bool = False
     log_level: str = "INFO"
     
-    @classmethod
-    def from_env(cls) -> "ServerSettings":
-        """Load from environment variables."""
-        return cls(
-            bot_port=int(os.getenv("BOT_PORT", "5000")),
-            mcp_server_port=int(os.getenv("MCP_SERVER_PORT", "8080")),
-            debug=os.getenv("DEBUG", "false").lower() == "true",
-            log_level=os.getenv("LOG_LEVEL", "INFO")
-        )
+    _ENV_KEYS: ClassVar[Dict[str, str]] = {
+        "bot_port": "BOT_PORT",
+        "mcp_server_port": "MCP_SERVER_PORT",
+        "mcp_server_threads": "MCP_SERVER_THREADS",
+        "debug": "DEBUG",
+        "log_level": "LOG_LEVEL",
+    }
 
 
 class Settings:
@@ -127,6 +186,7 @@ class Settings:
         self.config_dir = config_dir or Path(__file__).parent
         
         # Load environment settings
+        ensure_env_loaded()
         self.jenkins = JenkinsSettings.from_env()
         self.splunk = SplunkSettings.from_env()
         self.swarm = SwarmSettings.from_env()
@@ -137,71 +197,91 @@ class Settings:
         self._pipelines: Dict[str, Any] = {}
         self._channels: Dict[str, Any] = {}
         
+        # Lookups derived from the YAML configs
+        self._pipeline_by_name: Dict[str, Dict[str, Any]] = {}
+        self._enabled_pipelines: Tuple[Dict[str, Any], ...] = ()
+        self._webex_rooms: Tuple[Mapping[str, Any], ...] = ()
+        self._webex_people: Tuple[Mapping[str, Any], ...] = ()
+        
         self._load_yaml_configs()
+        self._index_configs()
     
     def _load_yaml_configs(self) -> None:
         """Load YAML configuration files."""
         # Load pipelines.yml
         pipelines_file = self.config_dir / "pipelines.yml"
         if pipelines_file.exists():
-            with open(pipelines_file) as f:
-                self._pipelines = yaml.safe_load(f) or {}
+            self._pipelines = _load_yaml_cached(str(pipelines_file), pipelines_file.stat().st_mtime)
         
         # Load channels.yml
         channels_file = self.config_dir / "channels.yml"
         if channels_file.exists():
-            with open(channels_file) as f:
-                self._channels = yaml.safe_load(f) or {}
+            self._channels = _load_yaml_cached(str(channels_file), channels_file.stat().st_mtime)
     
-    # Convenience properties
-    @property
+    def _index_configs(self) -> None:
+        """Precompute pipeline and channel lookups from the loaded configs."""
+        pipelines = self._pipelines.get("pipelines", [])
+        self._pipeline_by_name = {}
+        for p in pipelines:
+            # First definition wins, as with the previous linear scan
+            if p.get("name") and p["name"] not in self._pipeline_by_name:
+                self._pipeline_by_name[p["name"]] = p
+        self._enabled_pipelines = tuple(p for p in pipelines if p.get("enabled", True))
+        
+        # Rooms/people are handed out on every broadcast; freeze them so the
+        # shared tuples can be returned without copying
+        webex = self._channels.get("webex", {})
+        self._webex_rooms = tuple(
+            MappingProxyType(r) for r in webex.get("rooms", [])
+            if r.get("enabled", False) and r.get("roomId")
+        )
+        self._webex_people = tuple(
+            MappingProxyType(p) for p in webex.get("people", [])
+            if p.get("enabled", False) and p.get("email")
+        )
+    
+    # Convenience properties, resolved once per instance
+    @cached_property
     def jenkins_base_url(self) -> str:
         return self.jenkins.base_url
     
-    @property
+    @cached_property
     def jenkins_user(self) -> str:
         return self.jenkins.user
     
-    @property
+    @cached_property
     def jenkins_token(self) -> str:
         return self.jenkins.api_token
     
-    @property
+    @cached_property
     def splunk_host(self) -> str:
         return self.splunk.host
     
-    @property
+    @cached_property
     def splunk_token(self) -> str:
         return self.splunk.token
     
-    @property
+    @cached_property
     def webex_token(self) -> str:
         return self.webex.bot_token
     
     # Pipeline methods
     def get_pipeline(self, name: str) -> Optional[Dict[str, Any]]:
         """Get pipeline configuration by name."""
-        pipelines = self._pipelines.get("pipelines", [])
-        for p in pipelines:
-            if p.get("name") == name:
-                return p
-        return None
+        return self._pipeline_by_name.get(name)
     
-    def get_enabled_pipelines(self) -> List[Dict[str, Any]]:
+    def get_enabled_pipelines(self) -> Tuple[Dict[str, Any], ...]:
         """Get all enabled pipelines."""
-        pipelines = self._pipelines.get("pipelines", [])
-        return [p for p in pipelines if p.get("enabled", True)]
+        return self._enabled_pipelines
     
     # Channel methods
-    def get_webex_rooms(self) -> List[Dict[str, Any]]:
+    def get_webex_rooms(self) -> Tuple[Mapping[str, Any], ...]:
         """Get enabled Webex rooms."""
-        rooms = self._channels.get("webex", {}).get("rooms", [])
-        return [r for r in rooms if r.get("enabled", False) and r.get("roomId")]
+        return self._webex_rooms
     
-    def get_webex_people(self) -> List[Dict[str, Any]]:
+    def get_webex_people(self) -> Tuple[Mapping[str, Any], ...]:
         """Get enabled Webex people."""
-        people = self._channels.get("webex", {}).get("people", [])
-        return [p for p in people if p.get("enabled", False) and p.get("email")]
+        return self._webex_people
 
 
 # Singleton instance
@@ -0,0 +1,60 @@
+"""
+HTTP helpers - Shared, pooled sessions for the MCP tools and clients.
+
+Tools and clients that talk to the same Jenkins host share one
+session so keep-alive connections opened by one tool are reused by the
+next instead of paying a fresh TCP/TLS handshake.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Sessions keyed by (base_url, user, token)
+_SESSIONS: Dict[Tuple[str, str, str], requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_jenkins_session(base_url: str, user: str, token: str) -> requests.Session:
+    """
+    Get the shared authenticated session for a Jenkins host.
+    
+    Args:
+        base_url: Jenkins base URL
+        user: Jenkins username
+        token: Jenkins API token
+    
+    Returns:
+        Pooled requests session
+    """
+    key = (base_url, user, token)
+    session = _SESSIONS.get(key)
+    if session is not None:
+        return session
+    
+    # Tools are called from concurrent request threads: only one may
+    # create the session, or each would end up with its own pool
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            # Sized for parallel platform fetches; status retries stay on
+            # urllib3's idempotent methods, so a build POST is never repeated
+            adapter = HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504)
+                )
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.auth = (user, token)
+            session.headers.update({"Accept": "application/json"})
+            _SESSIONS[key] = session
+    return session
@@ -0,0 +1,49 @@
+"""
+JSON helpers - Fast decoding of Jenkins/Splunk API responses (and encoding
+of Splunk HEC payloads).
+
+Uses orjson when it is installed and falls back to the standard library.
+"""
+
+import json
+from typing import Any, Union
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Encode an object as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def response_json(response: requests.Response) -> Any:
+    """
+    Decode a response body, like ``Response.json()`` but without the text round-trip.
+    
+    Args:
+        response: HTTP response
+    
+    Returns:
+        Decoded JSON
+    
+    Raises:
+        requests.exceptions.JSONDecodeError: If the body is not valid JSON
+    """
+    try:
+        return json_loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.JSONDecodeError(str(e), response.text, 0) from e
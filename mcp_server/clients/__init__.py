@@ -1,6 +1,6 @@
 """MCP Clients package - clients for external MCP servers."""
 
-from mcp_server.clients.jenkins_client import JenkinsClient
-from mcp_server.clients.splunk_client import SplunkClient
+from mcp_server.clients.jenkins_client import JenkinsClient, get_jenkins_client
+from mcp_server.clients.splunk_client import SplunkClient, get_splunk_client
 
-__all__ = ["JenkinsClient", "SplunkClient"]
+__all__ = ["JenkinsClient", "SplunkClient", "get_jenkins_client", "get_splunk_client"]
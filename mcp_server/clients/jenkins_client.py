@@ -8,13 +8,17 @@ This client provides methods to interact with Jenkins:
 - Monitor build status
 """
 
-import os
-import re
 import logging
+import functools
+import threading
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
 
 import requests
+from cachetools import TTLCache
+
+from config.settings import Settings, get_settings
+from mcp_server._http import get_jenkins_session
+from mcp_server._json import response_json
 
 logger = logging.getLogger(__name__)
 
@@ -22,73 +26,105 @@ logger = logging.getLogger(__name__)
 class JenkinsClient:
     """Client for interacting with Jenkins API."""
     
+    INFO_CACHE_TTL = 2.0  # seconds
+    
     def __init__(
         self,
         base_url: Optional[str] = None,
         user: Optional[str] = None,
-        token: Optional[str] = None
+        token: Optional[str] = None,
+        settings: Optional[Settings] = None
     ):
         """
         Initialize Jenkins client.
         
         Args:
-            base_url: Jenkins base URL (falls back to env)
-            user: Jenkins username (falls back to env)
-            token: Jenkins API token (falls back to env)
+            base_url: Jenkins base URL (falls back to settings)
+            user: Jenkins username (falls back to settings)
+            token: Jenkins API token (falls back to settings)
+            settings: Settings to read defaults from (defaults to the shared instance)
         """
-        self.base_url = base_url or os.getenv("JENKINS_BASE_URL", "")
-        self.user = user or os.getenv("JENKINS_USER", "")
-        self.token = token or os.getenv("JENKINS_API_TOKEN", "")
+        jenkins = (settings or get_settings()).jenkins
+        self.base_url = base_url or jenkins.base_url
+        self.user = user or jenkins.user
+        self.token = token or jenkins.api_token
+        
+        # Stripped once; every request URL starts with it
+        self._base_url = self.base_url.rstrip("/")
         
         self._session = None
+        
+        # Job/build JSON keyed by (job_path, build_number, fields); a short TTL
+        # collapses repeated polls of the same job without serving stale state
+        self._info_cache: TTLCache = TTLCache(maxsize=256, ttl=self.INFO_CACHE_TTL)
+        self._info_lock = threading.Lock()
     
     @property
     def session(self) -> requests.Session:
-        """Get authenticated requests session."""
+        """Get authenticated, pooled requests session."""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.auth = (self.user, self.token)
-            self._session.headers.update({"Accept": "application/json"})
+            # Shared with the MCP tools, so one keep-alive pool serves every
+            # caller of the same Jenkins host
+            self._session = get_jenkins_session(self.base_url, self.user, self.token)
         return self._session
     
-    def get_job_info(self, job_path: str) -> Dict[str, Any]:
+    def _job_url(self, job_path: str, *parts: Any) -> str:
+        """Build a URL under a job, e.g. _job_url(path, 42, "api/json")."""
+        return "/".join((self._base_url, job_path.strip("/"), *map(str, parts)))
+    
+    @staticmethod
+    def _tree_params(fields: Optional[str]) -> Optional[Dict[str, str]]:
+        """Query params selecting only the given fields from a Jenkins JSON API."""
+        return {"tree": fields} if fields else None
+    
+    def get_job_info(self, job_path: str, fields: Optional[str] = None) -> Dict[str, Any]:
         """
         Get information about a Jenkins job.
         
         Args:
             job_path: Path to the job (e.g., job/FXOS/job/FXOS_PRECOMMIT_BAZEL)
+            fields: Optional Jenkins tree= filter (e.g., "lastBuild[number]")
             
         Returns:
             Job information dict
         """
-        url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/api/json"
-        
-        try:
-            r = self.session.get(url, timeout=15)
-            if r.status_code == 200:
-                return r.json()
-            else:
-                return {"error": f"HTTP {r.status_code}"}
-        except requests.RequestException as e:
-            return {"error": str(e)}
+        url = self._job_url(job_path, "api/json")
+        return self._get_info((job_path.strip("/"), None, fields), url, fields)
     
-    def get_build_info(self, job_path: str, build_number: int) -> Dict[str, Any]:
+    def get_build_info(
+        self,
+        job_path: str,
+        build_number: int,
+        fields: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get information about a specific build.
         
         Args:
             job_path: Path to the job
             build_number: Build number
+            fields: Optional Jenkins tree= filter (e.g., "building,result")
             
         Returns:
             Build information dict
         """
-        url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/{build_number}/api/json"
+        url = self._job_url(job_path, build_number, "api/json")
+        return self._get_info((job_path.strip("/"), build_number, fields), url, fields)
+    
+    def _get_info(self, key: Tuple, url: str, fields: Optional[str]) -> Dict[str, Any]:
+        """Fetch job/build JSON, reusing a recent successful response for the same key."""
+        with self._info_lock:
+            info = self._info_cache.get(key)
+        if info is not None:
+            return info
         
         try:
-            r = self.session.get(url, timeout=15)
+            r = self.session.get(url, params=self._tree_params(fields), timeout=15)
             if r.status_code == 200:
-                return r.json()
+                info = response_json(r)
+                with self._info_lock:
+                    self._info_cache[key] = info
+                return info
             else:
                 return {"error": f"HTTP {r.status_code}"}
         except requests.RequestException as e:
@@ -104,7 +140,7 @@ class JenkinsClient:
         Returns:
             Build number or None
         """
-        info = self.get_job_info(job_path)
+        info = self.get_job_info(job_path, fields="lastBuild[number]")
         
         if "error" in info:
             return None
@@ -127,7 +163,7 @@ class JenkinsClient:
         Returns:
             Tuple of (content, error_message)
         """
-        url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/{build_number}/artifact/{artifact_path}"
+        url = self._job_url(job_path, build_number, "artifact", artifact_path)
         
         try:
             r = self.session.get(url, timeout=20)
@@ -138,6 +174,13 @@ class JenkinsClient:
         except requests.RequestException as e:
             return None, str(e)
     
+    def invalidate_job(self, job_path: str) -> None:
+        """Drop cached job/build info for a job (e.g., after triggering it)."""
+        job_key = job_path.strip("/")
+        with self._info_lock:
+            for key in [k for k in self._info_cache if k[0] == job_key]:
+                self._info_cache.pop(key, None)
+    
     def trigger_build(
         self,
         job_path: str,
@@ -154,18 +197,20 @@ class JenkinsClient:
             Dict with queue_id or error
         """
         if parameters:
-            url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/buildWithParameters"
+            url = self._job_url(job_path, "buildWithParameters")
         else:
-            url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/build"
+            url = self._job_url(job_path, "build")
         
         try:
             r = self.session.post(url, data=parameters or {}, timeout=30)
             
+            # A new build changes lastBuild/building; drop cached info for the job
+            self.invalidate_job(job_path)
+            
             if r.status_code in (200, 201):
                 queue_location = r.headers.get("Location", "")
-                queue_id = None
-                if queue_location and "/queue/item/" in queue_location:
-                    queue_id = queue_location.split("/queue/item/")[1].rstrip("/")
+                _, found, tail = queue_location.rpartition("/queue/item/")
+                queue_id = tail.rstrip("/") if found else None
                 
                 return {
                     "success": True,
@@ -193,12 +238,12 @@ class JenkinsClient:
         Returns:
             Queue item information
         """
-        url = f"{self.base_url.rstrip('/')}/queue/item/{queue_id}/api/json"
+        url = f"{self._base_url}/queue/item/{queue_id}/api/json"
         
         try:
             r = self.session.get(url, timeout=10)
             if r.status_code == 200:
-                return r.json()
+                return response_json(r)
             else:
                 return {"error": f"HTTP {r.status_code}"}
         except requests.RequestException as e:
@@ -221,7 +266,7 @@ class JenkinsClient:
         Returns:
             Tuple of (console_text, next_offset)
         """
-        url = f"{self.base_url.rstrip('/')}/{job_path.strip('/')}/{build_number}/logText/progressiveText"
+        url = self._job_url(job_path, build_number, "logText/progressiveText")
         
         try:
             r = self.session.get(url, params={"start": start}, timeout=30)
@@ -244,5 +289,11 @@ class JenkinsClient:
         Returns:
             True if building, False otherwise
         """
-        info = self.get_build_info(job_path, build_number)
+        info = self.get_build_info(job_path, build_number, fields="building")
         return info.get("building", False)
+
+
+@functools.lru_cache(maxsize=1)
+def get_jenkins_client() -> JenkinsClient:
+    """Get the shared Jenkins client, configured from the settings singleton."""
+    return JenkinsClient()
@@ -5,14 +5,20 @@ This client provides methods to interact with Splunk:
 - Execute search queries
 - Get build reports
 - Analyze failure patterns
+- Send events to the HTTP Event Collector
 """
 
-import os
 import time
 import logging
+import functools
 from typing import Dict, Any, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import Settings, get_settings
+from mcp_server._json import json_dumps, response_json
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +26,58 @@ logger = logging.getLogger(__name__)
 class SplunkClient:
     """Client for interacting with Splunk API."""
     
+    # Job status polling (seconds)
+    POLL_INITIAL_DELAY = 0.1
+    POLL_BACKOFF = 1.5
+    POLL_MAX_DELAY = 5.0
+    
+    # HTTP Event Collector: events are sent many per request (HEC accepts
+    # concatenated event objects), capped to stay under its body size limit
+    HEC_PATH = "/services/collector/event"
+    HEC_BATCH_SIZE = 1000
+    
     def __init__(
         self,
         host: Optional[str] = None,
-        token: Optional[str] = None
+        token: Optional[str] = None,
+        settings: Optional[Settings] = None
     ):
         """
         Initialize Splunk client.
         
         Args:
-            host: Splunk host URL (falls back to env)
-            token: Splunk API token (falls back to env)
+            host: Splunk host URL (falls back to settings)
+            token: Splunk API token (falls back to settings)
+            settings: Settings to read defaults from (defaults to the shared instance)
         """
-        self.host = host or os.getenv("SPLUNK_HOST", "")
-        self.token = token or os.getenv("SPLUNK_TOKEN", "")
+        splunk = (settings or get_settings()).splunk
+        self.host = host or splunk.host
+        self.token = token or splunk.token
+        self.verify = splunk.ca_bundle or True
+        self.hec_url = (splunk.hec_url or self.host).rstrip("/")
+        self.hec_token = splunk.hec_token
+        
+        self._session = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """Get authenticated, pooled requests session."""
+        if self._session is None:
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504)
+                )
+            )
+            self._session = requests.Session()
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._session.headers.update({"Authorization": f"Bearer {self.token}"})
+            self._session.verify = self.verify
+        return self._session
     
     def search(
         self,
@@ -77,11 +121,6 @@ class SplunkClient:
         """Create a Splunk search job."""
         url = f"{self.host}/services/search/jobs"
         
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
         data = {
             "search": query,
             "earliest_time": earliest,
@@ -90,10 +129,10 @@ class SplunkClient:
         }
         
         try:
-            r = requests.post(url, headers=headers, data=data, timeout=30, verify=False)
+            r = self.session.post(url, data=data, timeout=30)
             
             if r.status_code == 201:
-                return r.json().get("sid")
+                return response_json(r).get("sid")
             else:
                 logger.error(f"Splunk job creation failed: {r.status_code}")
                 return None
@@ -111,43 +150,42 @@ class SplunkClient:
         results_url = f"{self.host}/services/search/jobs/{job_id}/results"
         status_url = f"{self.host}/services/search/jobs/{job_id}"
         
-        headers = {
-            "Authorization": f"Bearer {self.token}"
-        }
-        
-        start_time = time.time()
+        deadline = time.monotonic() + timeout
+        delay = self.POLL_INITIAL_DELAY
         
-        while time.time() - start_time < timeout:
+        while time.monotonic() < deadline:
             try:
                 # Check job status
-                r = requests.get(
+                r = self.session.get(
                     status_url,
-                    headers=headers,
                     params={"output_mode": "json"},
-                    timeout=10,
-                    verify=False
+                    timeout=10
                 )
                 
                 if r.status_code != 200:
                     break
                 
-                status = r.json().get("entry", [{}])[0].get("content", {})
+                status = response_json(r).get("entry", [{}])[0].get("content", {})
                 
                 if status.get("isDone"):
                     # Get results
-                    r = requests.get(
+                    r = self.session.get(
                         results_url,
-                        headers=headers,
-                        params={"output_mode": "json", "count": 0},
-                        timeout=30,
-                        verify=False
+                        params={"output_mode": "json_rows", "count": 0},
+                        timeout=30
                     )
                     
                     if r.status_code == 200:
-                        return r.json().get("results", [])
+                        return self._rows_to_dicts(response_json(r))
+                    break
+                
+                if status.get("dispatchState") == "FAILED":
+                    logger.error(f"Splunk search job {job_id} failed")
                     break
                 
-                time.sleep(1)
+                # Short searches finish quickly; back off for long ones
+                time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+                delay = min(delay * self.POLL_BACKOFF, self.POLL_MAX_DELAY)
             
             except requests.RequestException as e:
                 logger.error(f"Error waiting for Splunk results: {e}")
@@ -155,6 +193,37 @@ class SplunkClient:
         
         return []
     
+    def send_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Send events to the Splunk HTTP Event Collector in batches.
+        
+        Args:
+            events: Event payloads (each becomes one HEC event)
+        
+        Returns:
+            True if every batch was accepted
+        """
+        if not self.hec_url or not self.hec_token:
+            logger.warning("Splunk HEC not configured")
+            return False
+        
+        url = f"{self.hec_url}{self.HEC_PATH}"
+        headers = {"Authorization": f"Splunk {self.hec_token}"}
+        
+        for i in range(0, len(events), self.HEC_BATCH_SIZE):
+            body = b"\n".join(json_dumps({"event": event}) for event in events[i:i + self.HEC_BATCH_SIZE])
+            try:
+                r = self.session.post(url, data=body, headers=headers, timeout=30)
+            except requests.RequestException as e:
+                logger.error(f"Splunk HEC request failed: {e}")
+                return False
+            
+            if r.status_code != 200:
+                logger.error(f"Splunk HEC rejected events: {r.status_code}")
+                return False
+        
+        return True
+    
     def get_branch_status(self, branch_filter: str) -> Optional[Dict[str, Any]]:
         """
         Get the latest build status for a branch.
@@ -273,6 +342,12 @@ class SplunkClient:
             "success_rate": 0.0
         }
     
+    @staticmethod
+    def _rows_to_dicts(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert a json_rows payload ({"fields": [...], "rows": [[...]]}) to result dicts."""
+        fields = data.get("fields", [])
+        return [dict(zip(fields, row)) for row in data.get("rows", [])]
+    
     @staticmethod
     def _safe_float(value: Any) -> Optional[float]:
         """Safely convert value to float."""
@@ -292,3 +367,9 @@ class SplunkClient:
             return int(float(value))
         except (ValueError, TypeError):
             return 0
+
+
+@functools.lru_cache(maxsize=1)
+def get_splunk_client() -> SplunkClient:
+    """Get the shared Splunk client, configured from the settings singleton."""
+    return SplunkClient()
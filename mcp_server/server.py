@@ -14,26 +14,30 @@ Tools:
 - repackage: Trigger repackage operation
 """
 
-import os
 import logging
 import asyncio
+from types import MappingProxyType
 from typing import Any, Dict, Optional
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from dotenv import load_dotenv
 
+from config.settings import get_settings
+from mcp_server._json import json_dumps
 from mcp_server.tools.metrics import MetricsTool
 from mcp_server.tools.query import QueryTool
 from mcp_server.tools.builds import BuildsTool
 from mcp_server.tools.repackage import RepackageTool
 
-# Load environment variables
-load_dotenv()
-
-# Configure logging
+# Configure logging (config.settings has already loaded .env). The format
+# does not use thread/process fields, so skip collecting them per record.
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=getattr(logging, get_settings().server.log_level),
+    format="{asctime} - {name} - {levelname} - {message}",
+    datefmt="%H:%M:%S",
+    style="{"
 )
 logger = logging.getLogger(__name__)
 
@@ -47,37 +51,44 @@ query_tool = QueryTool()
 builds_tool = BuildsTool()
 repackage_tool = RepackageTool()
 
-# Tool registry
-TOOLS = {
+# Tool registry (read-only; fixed at import)
+TOOLS = MappingProxyType({
     "get_metrics": metrics_tool,
     "query_branch": query_tool,
     "start_build": builds_tool,
     "list_failures": query_tool,  # Uses same tool with different method
     "repackage": repackage_tool,
-}
+})
+TOOL_NAMES = tuple(TOOLS)
+
+# The health payload and tool listing never change, so they are serialized once
+_HEALTH_BODY = json_dumps({
+    "status": "healthy",
+    "service": "pipeline-notify-mcp",
+    "tools": TOOL_NAMES
+})
+_TOOLS_LIST_BODY = json_dumps({
+    "tools": [
+        {
+            "name": name,
+            "description": tool.description,
+            "parameters": tool.parameters
+        }
+        for name, tool in TOOLS.items()
+    ]
+})
 
 
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        "status": "healthy",
-        "service": "pipeline-notify-mcp",
-        "tools": list(TOOLS.keys())
-    })
+    return app.response_class(_HEALTH_BODY, mimetype="application/json")
 
 
 @app.route("/tools", methods=["GET"])
 def list_tools():
     """List available MCP tools."""
-    tools_info = []
-    for name, tool in TOOLS.items():
-        tools_info.append({
-            "name": name,
-            "description": tool.description,
-            "parameters": tool.parameters
-        })
-    return jsonify({"tools": tools_info})
+    return app.response_class(_TOOLS_LIST_BODY, mimetype="application/json")
 
 
 @app.route("/tools/execute", methods=["POST"])
@@ -98,7 +109,7 @@ def execute_tool():
     tool_name = data.get("tool")
     args = data.get("args", {})
     
-    logger.info(f"Executing tool: {tool_name} with args: {args}")
+    logger.info("Executing tool: %s with args: %s", tool_name, args)
     
     if not tool_name:
         return jsonify({"error": "tool name required"}), 400
@@ -106,7 +117,7 @@ def execute_tool():
     if tool_name not in TOOLS:
         return jsonify({
             "error": f"Unknown tool: {tool_name}",
-            "available_tools": list(TOOLS.keys())
+            "available_tools": TOOL_NAMES
         }), 404
     
     try:
@@ -121,7 +132,7 @@ def execute_tool():
         return jsonify(result)
     
     except Exception as e:
-        logger.exception(f"Error executing tool {tool_name}: {e}")
+        logger.exception("Error executing tool %s", tool_name)
         return jsonify({"error": str(e)}), 500
 
 
@@ -162,24 +173,31 @@ class MCPServer:
         
         tool = self.tools[name]
         
-        # Handle special case for list_failures
+        # Tools do blocking Jenkins/Splunk I/O; run them off the event loop
+        # so concurrent MCP calls overlap instead of queueing
         if name == "list_failures":
-            result = tool.list_failures(**arguments)
+            result = await asyncio.to_thread(tool.list_failures, **arguments)
         else:
-            result = tool.execute(**arguments)
+            result = await asyncio.to_thread(tool.execute, **arguments)
         
         return {"content": [{"type": "text", "text": result.get("formatted_output", str(result))}]}
 
 
 def run_http_server():
     """Run the HTTP server for bot/API access."""
-    port = int(os.getenv("MCP_SERVER_PORT", 8080))
-    debug = os.getenv("DEBUG", "false").lower() == "true"
+    server_settings = get_settings().server
+    port = server_settings.mcp_server_port
+    debug = server_settings.debug
     
-    logger.info(f"Starting MCP HTTP Server on port {port}")
-    logger.info(f"Available tools: {list(TOOLS.keys())}")
+    logger.info("Starting MCP HTTP Server on port %d", port)
+    logger.info("Available tools: %s", TOOL_NAMES)
     
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    if debug:
+        app.run(host="0.0.0.0", port=port, debug=debug)
+    else:
+        # Tool calls block on Jenkins/Splunk I/O; serve them on a thread pool
+        from waitress import serve
+        serve(app, host="0.0.0.0", port=port, threads=server_settings.mcp_server_threads)
 
 
 def main():
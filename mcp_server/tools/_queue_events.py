@@ -0,0 +1,140 @@
+"""
+Queue Events - Build-start notifications from the Jenkins SSE gateway.
+
+When the Jenkins sse-gateway plugin is installed, a single background
+listener per process subscribes to the "job" channel and resolves the
+build number of a queued item as soon as its run starts, instead of
+polling the queue item API. Any failure disables the listener and callers
+fall back to polling.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional
+
+import requests
+
+from mcp_server._json import json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class QueueEventListener:
+    """Resolves Jenkins queue IDs to build numbers from SSE job events."""
+    
+    STARTED_EVENT = "job_run_started"
+    
+    def __init__(self, session: requests.Session, base_url: str):
+        """
+        Initialize the listener (the stream is opened on first watch).
+        
+        Args:
+            session: Authenticated Jenkins session
+            base_url: Jenkins base URL
+        """
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.client_id = f"pipeline-notify-mcp-{os.getpid()}"
+        
+        self.available = True
+        self._waiters: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Set once events are flowing, or once the listener has given up
+        self._ready = threading.Event()
+    
+    def watch(self, queue_id: str) -> Optional[Future]:
+        """
+        Register interest in a queue item.
+        
+        Args:
+            queue_id: Jenkins queue item ID
+        
+        Returns:
+            Future resolving to the build number, or None if SSE is unavailable
+        """
+        with self._lock:
+            if not self.available:
+                return None
+            future = self._waiters.get(queue_id)
+            if future is None:
+                future = self._waiters[queue_id] = Future()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jenkins-sse", daemon=True)
+                self._thread.start()
+        return future
+    
+    def wait_ready(self, timeout: float) -> bool:
+        """
+        Wait until the job channel subscription is live.
+        
+        Builds that start before then are never reported, so callers must
+        check the queue item themselves once this returns.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if the listener is subscribed, False if not (yet)
+        """
+        return self._ready.wait(timeout) and self.available
+    
+    def unwatch(self, queue_id: str) -> None:
+        """Forget a queue item that is no longer being waited on."""
+        with self._lock:
+            self._waiters.pop(queue_id, None)
+    
+    def _run(self) -> None:
+        """Subscribe to the job channel and dispatch events until the stream ends."""
+        try:
+            r = self.session.get(
+                f"{self.base_url}/sse-gateway/connect",
+                params={"clientId": self.client_id},
+                timeout=10
+            )
+            r.raise_for_status()
+            
+            r = self.session.post(
+                f"{self.base_url}/sse-gateway/configure",
+                params={"batchId": 1},
+                json={"dispatcherId": self.client_id, "subscribe": [{"jenkins_channel": "job"}]},
+                timeout=10
+            )
+            r.raise_for_status()
+            
+            with self.session.get(
+                f"{self.base_url}/sse-gateway/listen/{self.client_id}",
+                stream=True,
+                timeout=(10, None)
+            ) as r:
+                r.raise_for_status()
+                self._ready.set()
+                for line in r.iter_lines():
+                    if line.startswith(b"data:"):
+                        self._dispatch(json_loads(line[5:]))
+        
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Jenkins SSE gateway unavailable, polling the queue instead: %s", e)
+        
+        finally:
+            with self._lock:
+                self.available = False
+                waiters, self._waiters = self._waiters, {}
+            self._ready.set()
+            for future in waiters.values():
+                future.set_exception(RuntimeError("Jenkins SSE stream closed"))
+    
+    def _dispatch(self, event: Any) -> None:
+        """Resolve the waiter for a run-started event."""
+        if not isinstance(event, dict) or event.get("jenkins_event") != self.STARTED_EVENT:
+            return
+        
+        with self._lock:
+            future = self._waiters.pop(str(event.get("job_run_queueId")), None)
+        if future is not None:
+            try:
+                future.set_result(int(event["jenkins_object_id"]))
+            except (KeyError, TypeError, ValueError) as e:
+                future.set_exception(e)
@@ -18,6 +18,10 @@ from typing import Dict, Any, Optional
 
 import requests
 
+from mcp_server._http import get_jenkins_session
+from mcp_server._json import response_json
+from mcp_server.tools._queue_events import QueueEventListener
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,22 +62,42 @@ class BuildsTool:
         }
     }
     
+    # Queue polling backoff (seconds)
+    QUEUE_POLL_INITIAL_DELAY = 0.2
+    QUEUE_POLL_MAX_DELAY = 2.0
+    
+    # Longest wait for the SSE subscription before polling instead (seconds)
+    SSE_READY_TIMEOUT = 5.0
+    
     def __init__(self):
         self.jenkins_base = os.getenv("JENKINS_BASE_URL", "")
         self.jenkins_user = os.getenv("JENKINS_USER", "")
         self.jenkins_token = os.getenv("JENKINS_API_TOKEN", "")
+        self.sse_enabled = os.getenv("JENKINS_SSE_ENABLED", "false").lower() == "true"
+        
+        # Job paths resolved from the environment once, keyed by pipeline
+        self._job_paths = {
+            name: os.getenv(cfg["job_path_env"], "")
+            for name, cfg in self.PIPELINES.items()
+        }
         
         self._session = None
+        self._queue_events = None
     
     @property
     def session(self) -> requests.Session:
-        """Get authenticated requests session."""
+        """Get the shared authenticated Jenkins session."""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.auth = (self.jenkins_user, self.jenkins_token)
-            self._session.headers.update({"Accept": "application/json"})
+            self._session = get_jenkins_session(self.jenkins_base, self.jenkins_user, self.jenkins_token)
         return self._session
     
+    @property
+    def queue_events(self) -> Optional[QueueEventListener]:
+        """Get the SSE build-start listener (None unless JENKINS_SSE_ENABLED)."""
+        if self._queue_events is None and self.sse_enabled:
+            self._queue_events = QueueEventListener(self.session, self.jenkins_base)
+        return self._queue_events
+    
     def execute(
         self,
         pipeline: str,
@@ -101,7 +125,7 @@ class BuildsTool:
             }
         
         config = self.PIPELINES[pipeline]
-        job_path = os.getenv(config["job_path_env"], "")
+        job_path = self._job_paths[pipeline]
         
         if not job_path:
             return {
@@ -150,7 +174,7 @@ class BuildsTool:
                 }
         
         except Exception as e:
-            logger.exception(f"Error triggering build: {e}")
+            logger.exception("Error triggering build of %s", pipeline)
             return {
                 "success": False,
                 "error": str(e),
@@ -214,6 +238,43 @@ class BuildsTool:
         """
         Wait for a queued build to get a build number.
         
+        Uses the SSE gateway when enabled and falls back to polling the
+        queue item otherwise.
+        
+        Args:
+            queue_id: Jenkins queue item ID
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            Build number or None
+        """
+        listener = self.queue_events
+        future = listener.watch(queue_id) if listener is not None else None
+        if future is None:
+            return self._poll_for_build_number(queue_id, timeout)
+        
+        deadline = time.monotonic() + timeout
+        try:
+            # Builds that start before the subscription is live are never
+            # reported: poll instead if it does not come up in time
+            if not listener.wait_ready(min(self.SSE_READY_TIMEOUT, timeout)):
+                return self._poll_for_build_number(queue_id, max(deadline - time.monotonic(), 0))
+            
+            # One immediate check covers a build that started before we subscribed
+            build_number = self._poll_for_build_number(queue_id, 0)
+            if build_number is None:
+                build_number = future.result(timeout=max(deadline - time.monotonic(), 0))
+            return build_number
+        except Exception:
+            # Stream closed or no event in time: finish by polling
+            return self._poll_for_build_number(queue_id, max(deadline - time.monotonic(), 0))
+        finally:
+            listener.unwatch(queue_id)
+    
+    def _poll_for_build_number(self, queue_id: str, timeout: float) -> Optional[int]:
+        """
+        Poll a queue item until it gets a build number (at least one request).
+        
         Args:
             queue_id: Jenkins queue item ID
             timeout: Maximum seconds to wait
@@ -223,22 +284,34 @@ class BuildsTool:
         """
         queue_url = f"{self.jenkins_base.rstrip('/')}/queue/item/{queue_id}/api/json"
         
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        deadline = time.monotonic() + timeout
+        delay = self.QUEUE_POLL_INITIAL_DELAY
+        
+        while True:
             try:
                 r = self.session.get(queue_url, timeout=10)
-                if r.status_code == 200:
-                    data = r.json()
-                    
-                    # Check if build has started
-                    executable = data.get("executable")
-                    if executable:
-                        return executable.get("number")
-                    
-                    # Still in queue
-                    if data.get("blocked") or data.get("buildable"):
-                        time.sleep(2)
-                        continue
+                if r.status_code != 200:
+                    break
+                
+                data = response_json(r)
+                
+                # Check if build has started
+                executable = data.get("executable")
+                if executable:
+                    return executable.get("number")
+                
+                # Cancelled items never get a build number
+                if data.get("cancelled"):
+                    break
+                
+                # Still in queue: most builds leave it within a second, so
+                # start polling fast and back off (or wait as Jenkins asks)
+                remaining = deadline - time.monotonic()
+                if (data.get("blocked") or data.get("buildable")) and remaining > 0:
+                    wait = self._retry_after(r) or delay
+                    time.sleep(min(wait, remaining))
+                    delay = min(delay * 2, self.QUEUE_POLL_MAX_DELAY)
+                    continue
                 
                 break
             
@@ -247,6 +320,14 @@ class BuildsTool:
         
         return None
     
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds requested by a Retry-After header, if any."""
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+    
     def get_build_status(self, pipeline: str, build_number: int) -> Dict[str, Any]:
         """
         Get the status of a specific build.
@@ -261,15 +342,14 @@ class BuildsTool:
         if pipeline not in self.PIPELINES:
             return {"error": f"Unknown pipeline: {pipeline}"}
         
-        config = self.PIPELINES[pipeline]
-        job_path = os.getenv(config["job_path_env"], "")
+        job_path = self._job_paths[pipeline]
         
         api_url = f"{self.jenkins_base.rstrip('/')}/{job_path.strip('/')}/{build_number}/api/json"
         
         try:
             r = self.session.get(api_url, timeout=15)
             if r.status_code == 200:
-                data = r.json()
+                data = response_json(r)
                 return {
                     "build_number": build_number,
                     "result": data.get("result"),
@@ -13,14 +13,35 @@ Platforms:
 
 import os
 import re
+import calendar
+import time
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
 
 import requests
+from cachetools import LRUCache, TTLCache
+
+from mcp_server._http import get_jenkins_session
+from mcp_server._json import response_json
 
 logger = logging.getLogger(__name__)
 
+class _CachedArtifact(NamedTuple):
+    """A parsed artifact with the validators needed to revalidate it."""
+    value: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked: float
+
+
+# Every artifact fetch of a metrics query runs here; sized to the shared
+# Jenkins session's connection pool (see mcp_server._http)
+_FETCH_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="metrics-fetch")
+
 
 class MetricsTool:
     """MCP Tool for retrieving Jenkins build metrics."""
@@ -41,8 +62,8 @@ class MetricsTool:
     
     required_params = ["job_type"]
     
-    # Platform configurations
-    FXOS_PLATFORMS = [
+    # Platform configurations, keyed by platform id in display order
+    FXOS_PLATFORMS = MappingProxyType({p["id"]: p for p in (
         {"id": "arm", "dir": "ARMsa/image", "outfile": "ARM-OutFile.txt", "cache": "bazel_cache.txt"},
         {"id": "armv", "dir": "ARMVsa/image", "outfile": "ARMV-OutFile.txt", "cache": "bazel_cache.txt"},
         {"id": "ssp", "dir": "sspsa/image", "outfile": "ssp-OutFile.txt", "cache": "bazel_cache.txt"},
@@ -52,35 +73,110 @@ class MetricsTool:
         {"id": "fp1k", "dir": "FP1Ksa/image", "outfile": "FP1K-OutFile.txt", "cache": "bazel_cache.txt"},
         {"id": "fp3k", "dir": "FP3Ksa/image", "outfile": "FP3K-OutFile.txt", "cache": "bazel_cache.txt"},
         {"id": "fp4k", "dir": "FP4Ksa/image", "outfile": "FP4K-OutFile.txt", "cache": "bazel_cache.txt"},
-    ]
+    )})
     
-    ASA_PLATFORMS = [
+    ASA_PLATFORMS = MappingProxyType({p["id"]: p for p in (
         {"id": "arm", "dir": "ARMsa/Xpix", "outfile": "armOut.txt"},
         {"id": "arm8", "dir": "ARMv8sa/Xpix", "outfile": "armv8Out.txt"},
         {"id": "smp", "dir": "SMPsa/Xpix", "outfile": "smpOut.txt"},
         {"id": "ssp", "dir": "SSPsa/Xpix", "outfile": "sspOut.txt"},
-    ]
+    )})
+    
+    # Regex patterns. Build times are captured only in `date` output form
+    # (zone optional), so a long marker line cannot make the match backtrack
+    BUILD_TIME_VALUE = r"[A-Za-z]{3} +[A-Za-z]{3} +\d{1,2} +\d{1,2}:\d{2}:\d{2}(?: +[\w+-]+)? +\d{4}"
+    BUILD_START_RE = re.compile(rf"BUILD_TIME_START *: *({BUILD_TIME_VALUE})")
+    BUILD_END_RE = re.compile(rf"BUILD_TIME_END *: *({BUILD_TIME_VALUE})")
+    # FXOS bazel_cache.txt, e.g. "remote cache hit: 12345 / 15000"
+    REMOTE_CACHE_RE = re.compile(r"remote cache hit:\s*(\d+)\s*/\s*(\d+)", re.IGNORECASE)
+    # ASA outfile Bazel summary lines
+    ELAPSED_RE = re.compile(r"INFO:\s*Elapsed time:\s*([\d.]+)s", re.IGNORECASE)
+    PROCESS_RE = re.compile(r"INFO:\s*(\d+)\s+processes:\s*(\d+)\s+remote cache hit", re.IGNORECASE)
+    # All outfile tokens in one alternation, so each line is searched once;
+    # match.lastgroup names the token (start, end, elapsed or hit)
+    OUTFILE_TOKEN_RE = re.compile(
+        rf"BUILD_TIME_START *: *(?P<start>{BUILD_TIME_VALUE})"
+        rf"|BUILD_TIME_END *: *(?P<end>{BUILD_TIME_VALUE})"
+        r"|(?i:INFO:\s*Elapsed time:\s*[\d.]+s)(?P<elapsed>)"
+        r"|(?i:INFO:\s*(?P<total>\d+)\s+processes:\s*(?P<hit>\d+)\s+remote cache hit)"
+    )
     
-    # Regex patterns
-    BUILD_START_RE = re.compile(r"BUILD_TIME_START\s*:\s*(.+)")
-    BUILD_END_RE = re.compile(r"BUILD_TIME_END\s*:\s*(.+)")
+    # Fixed-width metrics table row (a bound str.format, resolved once)
+    _format_row = "{:<10} {:>12} {:>12} {:>15} {:<15}".format
+    TABLE_HEADER = _format_row("Platform", "Build Time", "Cache Hit %", "Hits / Total", "Status")
     
-    def __init__(self):
-        self.jenkins_base = os.getenv("JENKINS_BASE_URL", "")
-        self.jenkins_user = os.getenv("JENKINS_USER", "")
-        self.jenkins_token = os.getenv("JENKINS_API_TOKEN", "")
+    # Build timestamps, e.g. "Tue Nov 25 05:21:30 UTC 2025"
+    TIMESTAMP_RE = re.compile(r"\w{3}\s+(\w{3})\s+(\d{1,2})\s+(\d{2}):(\d{2}):(\d{2})\s+\w+\s+(\d{4})")
+    MONTHS = {
+        "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+        "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
+    }
+    # Fallback formats; the zone word is stripped first (timestamps are UTC
+    # and %Z is the slowest strptime directive)
+    TIMEZONE_RE = re.compile(r"\s+[A-Za-z][\w+-]*(?=\s+\d{4}$)")
+    TIMESTAMP_FORMATS = (
+        "%a %b %d %H:%M:%S %Y",
+        "%a %b %e %H:%M:%S %Y",
+    )
+    
+    # Seconds to reuse a job's latest build number
+    LATEST_BUILD_TTL = 10
+    # Artifacts of a build rarely change once archived: reuse them outright for
+    # a while, then revalidate with a conditional GET. Bound the cache by size.
+    ARTIFACT_REVALIDATE_AFTER = 300
+    ARTIFACT_CACHE_BYTES = 64 * 1024 * 1024
+    # Scanned outfiles (only the extracted fields are kept)
+    OUTFILE_CACHE_SIZE = 512
+    # Seconds to reuse a build's artifact listing (in-flight builds add files)
+    ARTIFACT_LIST_TTL = 30
+    # FXOS outfiles only need the start/end markers near the top and bottom
+    OUTFILE_HEAD_RANGE = "bytes=0-8191"
+    OUTFILE_TAIL_RANGE = "bytes=-65536"
+    
+    def __init__(
+        self,
+        jenkins_base: Optional[str] = None,
+        jenkins_user: Optional[str] = None,
+        jenkins_token: Optional[str] = None
+    ):
+        """
+        Initialize the metrics tool.
+        
+        Args:
+            jenkins_base: Jenkins base URL (falls back to JENKINS_BASE_URL)
+            jenkins_user: Jenkins username (falls back to JENKINS_USER)
+            jenkins_token: Jenkins API token (falls back to JENKINS_API_TOKEN)
+        """
+        self.jenkins_base = jenkins_base or os.getenv("JENKINS_BASE_URL", "")
+        self.jenkins_user = jenkins_user or os.getenv("JENKINS_USER", "")
+        self.jenkins_token = jenkins_token or os.getenv("JENKINS_API_TOKEN", "")
         self.job_path_fxos = os.getenv("JENKINS_JOB_PATH_FXOS_PB", "")
         self.job_path_asa = os.getenv("JENKINS_JOB_PATH_ASA", "")
         
+        # Normalized job URLs, so per-platform URLs are a single f-string
+        self._job_urls = {
+            path: f"{self.jenkins_base.rstrip('/')}/{path.strip('/')}"
+            for path in (self.job_path_fxos, self.job_path_asa)
+        }
+        
         self._session = None
+        
+        self._latest_cache: TTLCache = TTLCache(maxsize=16, ttl=self.LATEST_BUILD_TTL)
+        self._artifact_cache: LRUCache = LRUCache(
+            maxsize=self.ARTIFACT_CACHE_BYTES,
+            getsizeof=lambda entry: len(entry.value)
+        )
+        self._outfile_cache: LRUCache = LRUCache(maxsize=self.OUTFILE_CACHE_SIZE)
+        self._artifact_list_cache: TTLCache = TTLCache(maxsize=64, ttl=self.ARTIFACT_LIST_TTL)
+        self._cache_lock = threading.Lock()
+        
+        self._last_timestamp_format: Optional[str] = None
     
     @property
     def session(self) -> requests.Session:
-        """Get authenticated requests session."""
+        """Get the shared authenticated Jenkins session."""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.auth = (self.jenkins_user, self.jenkins_token)
-            self._session.headers.update({"Accept": "application/json"})
+            self._session = get_jenkins_session(self.jenkins_base, self.jenkins_user, self.jenkins_token)
         return self._session
     
     def execute(self, job_type: str, build_number: Optional[int] = None) -> Dict[str, Any]:
@@ -98,10 +194,10 @@ class MetricsTool:
         
         if job_type == "FXOS":
             job_path = self.job_path_fxos
-            platforms = self.FXOS_PLATFORMS
+            platforms = self.FXOS_PLATFORMS.values()
         elif job_type == "ASA":
             job_path = self.job_path_asa
-            platforms = self.ASA_PLATFORMS
+            platforms = self.ASA_PLATFORMS.values()
         else:
             return {"error": f"Invalid job_type: {job_type}"}
         
@@ -111,11 +207,19 @@ class MetricsTool:
             if build_number is None:
                 return {"error": f"Could not determine build number: {build_alias}"}
         
-        # Collect metrics for each platform
-        rows = []
-        for platform in platforms:
-            row = self._collect_platform_metrics(job_path, build_number, platform, job_type)
-            rows.append(row)
+        # One listing call tells us which artifacts exist (None: unknown)
+        artifacts = self._list_artifacts(job_path, build_number)
+        
+        # Start every platform's fetches at once, then assemble the rows in
+        # platform order as they complete
+        fetches = [
+            self._submit_platform_fetches(job_path, build_number, platform, job_type, artifacts)
+            for platform in platforms
+        ]
+        rows = [
+            self._platform_row(platform, job_type, platform_fetches)
+            for platform, platform_fetches in zip(platforms, fetches)
+        ]
         
         # Format output
         formatted = self._format_metrics(rows, job_type, build_number, job_path)
@@ -127,38 +231,124 @@ class MetricsTool:
             "formatted_output": formatted
         }
     
+    def _job_url(self, job_path: str) -> str:
+        """Get the full URL of a job."""
+        url = self._job_urls.get(job_path)
+        if url is None:
+            url = f"{self.jenkins_base.rstrip('/')}/{job_path.strip('/')}"
+        return url
+    
     def _get_latest_build(self, job_path: str) -> Tuple[str, Optional[int]]:
-        """Get the latest build number for a job."""
-        api_url = f"{self.jenkins_base.rstrip('/')}/{job_path.strip('/')}/api/json"
+        """Get the latest build number for a job (cached briefly)."""
+        with self._cache_lock:
+            build_number = self._latest_cache.get(job_path)
+        if build_number is not None:
+            return "lastBuild", build_number
+        
+        api_url = f"{self._job_url(job_path)}/api/json"
         
         try:
             r = self.session.get(api_url, timeout=15)
             if r.status_code != 200:
                 return f"Job API returned {r.status_code}", None
             
-            data = r.json()
-            if data.get("lastBuild"):
-                return "lastBuild", data["lastBuild"].get("number")
-            return "No builds found", None
+            data = response_json(r)
+            build_number = (data.get("lastBuild") or {}).get("number")
+            if build_number is None:
+                return "No builds found", None
+            
+            with self._cache_lock:
+                self._latest_cache[job_path] = build_number
+            return "lastBuild", build_number
         
         except requests.RequestException as e:
             return str(e), None
     
-    def _collect_platform_metrics(
+    def _list_artifacts(self, job_path: str, build_number: int) -> Optional[Dict[str, str]]:
+        """
+        List a build's archived artifacts in one tree-filtered API call.
+        
+        Args:
+            job_path: Jenkins job path
+            build_number: Build number
+        
+        Returns:
+            Artifact relative path -> URL, or None if the listing failed
+            (callers then fetch by constructed URL)
+        """
+        key = (job_path, build_number)
+        with self._cache_lock:
+            artifacts = self._artifact_list_cache.get(key)
+        if artifacts is not None:
+            return artifacts
+        
+        build_root = f"{self._job_url(job_path)}/{build_number}"
+        try:
+            r = self.session.get(
+                f"{build_root}/api/json",
+                params={"tree": "artifacts[relativePath]"},
+                timeout=15
+            )
+            if r.status_code != 200:
+                return None
+            
+            artifacts = {
+                a["relativePath"]: f"{build_root}/artifact/{a['relativePath']}"
+                for a in response_json(r).get("artifacts", [])
+            }
+        except (requests.RequestException, ValueError, KeyError):
+            return None
+        
+        with self._cache_lock:
+            self._artifact_list_cache[key] = artifacts
+        return artifacts
+    
+    def _submit_platform_fetches(
         self,
         job_path: str,
         build_number: int,
         platform: Dict[str, str],
-        job_type: str
-    ) -> Dict[str, Any]:
-        """Collect metrics for a single platform."""
-        plat_id = platform["id"]
+        job_type: str,
+        artifacts: Optional[Dict[str, str]]
+    ) -> Dict[str, Optional[Future]]:
+        """
+        Start a platform's artifact fetches on the shared pool.
+        
+        Returns:
+            Futures keyed by "outfile" (and "cache" for FXOS); None marks a
+            file missing from the artifact listing, which is not fetched
+        """
         plat_dir = platform["dir"]
-        outfile = platform["outfile"]
+        artifact_root = f"{self._job_url(job_path)}/{build_number}/artifact"
+        
+        def artifact_url(name: str) -> Optional[str]:
+            rel_path = f"{plat_dir}/{name}"
+            if artifacts is None:
+                return f"{artifact_root}/{rel_path}"
+            return artifacts.get(rel_path)
+        
+        fetches: Dict[str, Optional[Future]] = {}
+        
+        outfile_url = artifact_url(platform["outfile"])
+        fetches["outfile"] = _FETCH_POOL.submit(self._fetch_outfile, outfile_url, job_type) if outfile_url else None
+        
+        # FXOS cache stats live in a separate file
         cache_file = platform.get("cache")
+        if cache_file and job_type == "FXOS":
+            cache_url = artifact_url(cache_file)
+            fetches["cache"] = _FETCH_POOL.submit(self._get_artifact, cache_url) if cache_url else None
         
+        return fetches
+    
+    def _platform_row(
+        self,
+        platform: Dict[str, str],
+        job_type: str,
+        fetches: Dict[str, Optional[Future]]
+    ) -> Dict[str, Any]:
+        """Wait for a platform's fetches and build its metrics row."""
         result = {
-            "platform": plat_id,
+            "platform": platform["id"],
             "duration_mmss": None,
             "cache_hit": None,
             "cache_total": None,
@@ -166,49 +356,216 @@ class MetricsTool:
             "errors": []
         }
         
-        # Build artifact URL
-        artifact_root = f"{self.jenkins_base.rstrip('/')}/{job_path.strip('/')}/{build_number}/artifact"
-        outfile_url = f"{artifact_root}/{plat_dir}/{outfile}"
+        # Outfile: build times (and cache stats from process info for ASA)
+        outfile_future = fetches["outfile"]
+        if outfile_future is None:
+            result["errors"].append("Outfile: missing")
+        else:
+            try:
+                status, scan = outfile_future.result()
+                if status == 200:
+                    start, end = scan["start"], scan["end"]
+                    if start and end:
+                        duration = self._calculate_duration(start, end)
+                        if duration:
+                            result["duration_mmss"] = self._format_duration(duration)
+                    
+                    if job_type == "ASA":
+                        hit, total = scan["hit"], scan["total"]
+                        if hit is not None and total is not None:
+                            result["cache_hit"] = hit
+                            result["cache_total"] = total
+                            result["cache_pct"] = (hit / total * 100) if total > 0 else 0
+                else:
+                    result["errors"].append(f"Outfile: HTTP {status}")
+            except requests.RequestException as e:
+                result["errors"].append(f"Outfile: {e}")
+        
+        # Cache file for FXOS
+        if "cache" in fetches:
+            cache_future = fetches["cache"]
+            if cache_future is None:
+                result["errors"].append("Cache: missing")
+            else:
+                try:
+                    status, text = cache_future.result()
+                    if status == 200:
+                        hit, total = self._parse_cache_file(text)
+                        if hit is not None:
+                            result["cache_hit"] = hit
+                            result["cache_total"] = total
+                            result["cache_pct"] = (hit / total * 100) if total > 0 else 0
+                    else:
+                        result["errors"].append(f"Cache: HTTP {status}")
+                except requests.RequestException as e:
+                    result["errors"].append(f"Cache: {e}")
+        
+        return result
+    
+    def _get_artifact(self, url: str) -> Tuple[int, str]:
+        """
+        Fetch an artifact's text, reusing previously downloaded artifacts.
+        
+        Args:
+            url: Artifact URL
+        
+        Returns:
+            (HTTP status, body text); only successful fetches are cached
+        
+        Raises:
+            requests.RequestException: If Jenkins is unreachable
+        """
+        status, text = self._cached_fetch(self._artifact_cache, url, lambda r: r.text)
+        return status, text if text is not None else ""
+    
+    def _fetch_outfile(self, url: str, job_type: str) -> Tuple[int, Dict[str, Any]]:
+        """
+        Stream an outfile and extract its metrics, reusing earlier scans.
+        
+        Args:
+            url: Outfile URL
+            job_type: FXOS or ASA
+        
+        Returns:
+            (HTTP status, scan result from _scan_outfile); only successful
+            scans are cached
+        
+        Raises:
+            requests.RequestException: If Jenkins is unreachable
+        """
+        def scan(r: requests.Response) -> Dict[str, Any]:
+            r.encoding = r.encoding or "utf-8"
+            return self._scan_outfile(r.iter_lines(decode_unicode=True), job_type)
+        
+        def scan_ranges(r: requests.Response) -> Dict[str, Any]:
+            # 200 means Jenkins ignored the Range header: scan the whole log
+            result = scan(r)
+            if r.status_code == 206 and result["end"] is None:
+                with self.session.get(
+                    url, headers={"Range": self.OUTFILE_TAIL_RANGE}, stream=True, timeout=20
+                ) as tail:
+                    if tail.status_code in (200, 206):
+                        tail_result = scan(tail)
+                        result["start"] = result["start"] or tail_result["start"]
+                        result["end"] = tail_result["end"]
+            return result
+        
+        if job_type == "FXOS":
+            # FXOS cache stats come from a separate file, so only the head
+            # and tail of the (multi-MB) log are downloaded
+            status, result = self._cached_fetch(
+                self._outfile_cache, url, scan_ranges, {"Range": self.OUTFILE_HEAD_RANGE}
+            )
+        else:
+            status, result = self._cached_fetch(self._outfile_cache, url, scan)
+        return status, result if result is not None else {}
+    
+    def _cached_fetch(
+        self,
+        cache: LRUCache,
+        url: str,
+        parse: Callable[[requests.Response], Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Any]:
+        """
+        GET and parse an artifact through a cache of parsed results.
+        
+        Recently checked entries are returned without a request. Older ones
+        are revalidated with If-None-Match / If-Modified-Since, so an
+        unchanged artifact costs a 304 with no body.
+        
+        Args:
+            cache: Cache of _CachedArtifact entries keyed by URL
+            url: Artifact URL
+            parse: Extracts the cached value from a streamed 200 (or 206) response
+            headers: Extra request headers, e.g. a Range
+        
+        Returns:
+            (HTTP status, parsed value or None)
+        
+        Raises:
+            requests.RequestException: If Jenkins is unreachable
+        """
+        with self._cache_lock:
+            entry = cache.get(url)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked < self.ARTIFACT_REVALIDATE_AFTER:
+            return 200, entry.value
         
-        # Fetch outfile for build times
+        headers = dict(headers) if headers else {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        
+        # Closing the response early lets parsers skip the rest of a large log
+        r = self.session.get(url, headers=headers, stream=True, timeout=20)
         try:
-            r = self.session.get(outfile_url, timeout=20)
-            if r.status_code == 200:
-                start, end = self._parse_build_times(r.text)
-                if start and end:
-                    duration = self._calculate_duration(start, end)
-                    if duration:
-                        result["duration_mmss"] = self._format_duration(duration)
-                
-                # For ASA, parse cache from outfile (process info)
-                if job_type == "ASA":
-                    hit, total = self._parse_asa_cache(r.text)
-                    if hit is not None and total is not None:
-                        result["cache_hit"] = hit
-                        result["cache_total"] = total
-                        result["cache_pct"] = (hit / total * 100) if total > 0 else 0
+            if r.status_code == 304 and entry is not None:
+                value = entry.value
+            elif r.status_code in (200, 206):
+                value = parse(r)
             else:
-                result["errors"].append(f"Outfile: HTTP {r.status_code}")
-        except requests.RequestException as e:
-            result["errors"].append(f"Outfile: {e}")
+                return r.status_code, None
+            
+            entry = _CachedArtifact(
+                value,
+                r.headers.get("ETag") or (entry.etag if entry else None),
+                r.headers.get("Last-Modified") or (entry.last_modified if entry else None),
+                now
+            )
+        finally:
+            r.close()
         
-        # Fetch cache file for FXOS
-        if cache_file and job_type == "FXOS":
-            cache_url = f"{artifact_root}/{plat_dir}/{cache_file}"
+        with self._cache_lock:
             try:
-                r = self.session.get(cache_url, timeout=20)
-                if r.status_code == 200:
-                    hit, total = self._parse_cache_file(r.text)
-                    if hit is not None:
-                        result["cache_hit"] = hit
-                        result["cache_total"] = total
-                        result["cache_pct"] = (hit / total * 100) if total > 0 else 0
-                else:
-                    result["errors"].append(f"Cache: HTTP {r.status_code}")
-            except requests.RequestException as e:
-                result["errors"].append(f"Cache: {e}")
+                cache[url] = entry
+            except ValueError:
+                pass  # larger than the whole cache
+        return 200, value
+    
+    def _scan_outfile(self, lines: Iterable[str], job_type: str) -> Dict[str, Any]:
+        """
+        Extract build times (and ASA cache stats) from outfile lines.
         
-        return result
+        Stops reading as soon as every needed value has been found. Matches
+        _parse_build_times and _parse_asa_cache on the whole text.
+        
+        Args:
+            lines: Outfile lines
+            job_type: FXOS or ASA
+        
+        Returns:
+            Dict with start, end, hit and total (None when not found)
+        """
+        scan: Dict[str, Any] = {"start": None, "end": None, "hit": None, "total": None}
+        need_cache = job_type == "ASA"
+        elapsed_seen = 0
+        
+        for line in lines:
+            match = self.OUTFILE_TOKEN_RE.search(line)
+            if match is None:
+                continue
+            
+            token = match.lastgroup
+            if token == "start":
+                if scan["start"] is None:
+                    scan["start"] = match.group("start").strip()
+            elif token == "end":
+                if scan["end"] is None:
+                    scan["end"] = match.group("end").strip()
+            elif token == "elapsed":
+                elapsed_seen += 1
+            elif need_cache and elapsed_seen >= 2 and scan["total"] is None:
+                # Process info is read from after the second "Elapsed time" line
+                scan["total"] = int(match.group("total"))
+                scan["hit"] = int(match.group("hit"))
+            
+            if scan["start"] and scan["end"] and (not need_cache or scan["total"] is not None):
+                break
+        
+        return scan
     
     def _parse_build_times(self, text: str) -> Tuple[Optional[str], Optional[str]]:
         """Parse build start and end times from outfile."""
@@ -230,36 +587,45 @@ class MetricsTool:
         return None
     
     def _parse_timestamp(self, raw: str) -> Optional[float]:
-        """Parse timestamp string to epoch."""
+        """Parse timestamp string to epoch (timestamps are UTC)."""
         if not raw:
             return None
         
         # Example: Tue Nov 25 05:21:30 UTC 2025
-        formats = [
-            "%a %b %d %H:%M:%S %Z %Y",
-            "%a %b %e %H:%M:%S %Z %Y",
-        ]
+        match = self.TIMESTAMP_RE.fullmatch(raw)
+        if match:
+            mon, day, hour, minute, sec, year = match.groups()
+            month = self.MONTHS.get(mon)
+            if month:
+                return float(calendar.timegm(
+                    (int(year), month, int(day), int(hour), int(minute), int(sec), 0, 0, 0)
+                ))
+        
+        # Unusual shapes: try the format that worked last time first
+        raw = self.TIMEZONE_RE.sub("", raw.strip(), count=1)
+        formats = self.TIMESTAMP_FORMATS
+        if self._last_timestamp_format in formats:
+            formats = (self._last_timestamp_format,) + formats
         
         for fmt in formats:
             try:
                 dt = datetime.strptime(raw, fmt)
-                return dt.timestamp()
             except ValueError:
                 continue
+            self._last_timestamp_format = fmt
+            return float(calendar.timegm(dt.utctimetuple()))
         
         return None
     
     def _format_duration(self, seconds: float) -> str:
         """Format seconds as MM:SS."""
-        total = int(round(seconds))
-        m = total // 60
-        s = total % 60
+        m, s = divmod(int(seconds + 0.5), 60)
         return f"{m:02d}:{s:02d}"
     
     def _parse_cache_file(self, text: str) -> Tuple[Optional[int], Optional[int]]:
         """Parse FXOS bazel_cache.txt for hit stats."""
         # Look for: remote cache hit: 12345 / 15000
-        match = re.search(r"remote cache hit:\s*(\d+)\s*/\s*(\d+)", text, re.IGNORECASE)
+        match = self.REMOTE_CACHE_RE.search(text)
         if match:
             return int(match.group(1)), int(match.group(2))
         return None, None
@@ -267,20 +633,15 @@ class MetricsTool:
     def _parse_asa_cache(self, text: str) -> Tuple[Optional[int], Optional[int]]:
         """Parse ASA outfile for cache stats from process info."""
         # Find second "Elapsed time" block and get process info
-        elapsed_pattern = re.compile(r"INFO:\s*Elapsed time:\s*([\d.]+)s", re.IGNORECASE)
-        elapsed_matches = list(elapsed_pattern.finditer(text))
+        elapsed = self.ELAPSED_RE.finditer(text)
+        next(elapsed, None)
+        second = next(elapsed, None)
         
-        if len(elapsed_matches) < 2:
+        if second is None:
             return None, None
         
-        remaining = text[elapsed_matches[1].end():]
-        
         # Pattern: INFO: 15030 processes: 14875 remote cache hit
-        process_match = re.search(
-            r"INFO:\s*(\d+)\s+processes:\s*(\d+)\s+remote cache hit",
-            remaining,
-            re.IGNORECASE
-        )
+        process_match = self.PROCESS_RE.search(text, second.end())
         
         if process_match:
             total = int(process_match.group(1))
@@ -300,18 +661,10 @@ class MetricsTool:
         if not rows:
             return "🔧 Jenkins Build Metrics\nNo data available"
         
-        total_platforms = len(rows)
-        issues = sum(1 for r in rows if r.get("errors"))
-        
-        lines = [
-            f"🔧 **Jenkins Build Metrics - {job_type}**",
-            f"Build #{build_number} | Platforms: {total_platforms} | Issues: {issues}",
-            "",
-            "```",
-            f"{'Platform':<10} {'Build Time':>12} {'Cache Hit %':>12} {'Hits / Total':>15} {'Status':<15}",
-            "-" * 70,
-        ]
-        
+        # Rows are formatted first so issues are counted in the same pass
+        issues = 0
+        body_lines = []
+        format_row = self._format_row
         for row in rows:
             plat = row.get("platform", "-").upper()
             dur = row.get("duration_mmss") or "—"
@@ -320,12 +673,25 @@ class MetricsTool:
             pct = row.get("cache_pct")
             errs = row.get("errors", [])
             
-            pct_str = f"{pct:.1f}%" if isinstance(pct, (int, float)) else "—"
+            pct_str = f"{pct:.1f}%" if pct is not None else "—"
             ratio = f"{hit:,} / {tot:,}" if hit is not None and tot is not None else "—"
-            status = f"⚠️ {errs[0][:20]}" if errs else "✅ OK"
+            if errs:
+                issues += 1
+                status = f"⚠️ {errs[0][:20]}"
+            else:
+                status = "✅ OK"
             
-            lines.append(f"{plat:<10} {dur:>12} {pct_str:>12} {ratio:>15} {status:<15}")
+            body_lines.append(format_row(plat, dur, pct_str, ratio, status))
         
+        lines = [
+            f"🔧 **Jenkins Build Metrics - {job_type}**",
+            f"Build #{build_number} | Platforms: {len(rows)} | Issues: {issues}",
+            "",
+            "```",
+            self.TABLE_HEADER,
+            "-" * 70,
+        ]
+        lines += body_lines
         lines.extend([
             "```",
             "",
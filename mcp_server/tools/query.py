@@ -14,14 +14,24 @@ Branches:
 """
 
 import os
-import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import LRUCache, TTLCache
+
+from mcp_server._http import get_jenkins_session
+from mcp_server._json import json_loads, response_json
 
 logger = logging.getLogger(__name__)
 
+# Background Jenkins checks of failing branches (shared by all requests)
+_CHECK_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="query-check")
+
 
 class QueryTool:
     """MCP Tool for querying Splunk branch status."""
@@ -32,6 +42,10 @@ class QueryTool:
         "branch": {
             "type": "string",
             "description": "Branch name: fxos_19, fxos_18, cairo, lina"
+        },
+        "force_refresh": {
+            "type": "boolean",
+            "description": "Bypass cached results (optional)"
         }
     }
     
@@ -65,21 +79,95 @@ class QueryTool:
         }
     }
     
+    # Latest build of a branch; joined onto one line once so every request
+    # sends the same compact SPL
+    SPLUNK_QUERY = " ".join(line.strip() for line in """
+        search index=ci_builds {splunk_filter}
+        | head 1
+        | eval Review=Review
+        | eval make_status=coalesce(make_result, "UNKNOWN")
+        | eval bazel_status=coalesce(bazel_result, "UNKNOWN")
+        | table Review, make_status, bazel_status, make_url, bazel_url, make_duration, bazel_duration
+    """.splitlines() if line.strip())
+    
+    # Seconds to reuse a branch's status (a 24h window barely moves in a minute)
+    BRANCH_CACHE_TTL = 60
+    # Reviews whose delta-change verdict is remembered
+    SWARM_CACHE_SIZE = 256
+    # Bytes of greperror.txt to read (the error is cut to 200 characters)
+    GREPERROR_MAX_BYTES = 8192
+    # (connect, read) timeouts; the export read covers the search itself
+    REQUEST_TIMEOUT = (3.05, 10)
+    SEARCH_TIMEOUT = (3.05, 60)
+    
+    # Branch status cards (bound str.format_map, resolved once); the review
+    # segment is pre-formatted or empty
+    _STATUS_CARD = (
+        "**{branch}** - {status}\n"
+        "\n"
+        "• **Make:** {make_icon} {make_status}\n"
+        "• **Bazel:** {bazel_icon} {bazel_status}"
+        "{review_line}"
+    )
+    _format_status_card = _STATUS_CARD.format_map
+    _format_error_status_card = (_STATUS_CARD + "\n\n**Error:** {error}").format_map
+    
     def __init__(self):
         self.splunk_host = os.getenv("SPLUNK_HOST", "")
         self.splunk_token = os.getenv("SPLUNK_TOKEN", "")
+        # CA bundle for the Splunk certificate (system CAs when unset)
+        self.splunk_verify = os.getenv("SPLUNK_CA_BUNDLE") or True
         self.swarm_base = os.getenv("SWARM_BASE_URL", "")
         self.swarm_token = os.getenv("SWARM_API_TOKEN", "")
         self.jenkins_base = os.getenv("JENKINS_BASE_URL", "")
         self.jenkins_user = os.getenv("JENKINS_USER", "")
         self.jenkins_token = os.getenv("JENKINS_API_TOKEN", "")
+        
+        # Branch results keyed by Splunk filter (aliases share an entry)
+        self._cache: TTLCache = TTLCache(maxsize=32, ttl=self.BRANCH_CACHE_TTL)
+        # Delta-change verdicts keyed by review number
+        self._swarm_delta_cache: LRUCache = LRUCache(maxsize=self.SWARM_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+        
+        self._session = None
+        self._jenkins_session = None
     
-    def execute(self, branch: str) -> Dict[str, Any]:
+    @property
+    def session(self) -> requests.Session:
+        """Get the pooled session shared by the Splunk and Swarm calls."""
+        if self._session is None:
+            # Each host authenticates differently, so credentials stay per request.
+            # Every call here is a read (the Splunk POST only runs a search),
+            # so POST may be retried on gateway errors too.
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(["GET", "POST"])
+                )
+            )
+            self._session = requests.Session()
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+        return self._session
+    
+    @property
+    def jenkins_session(self) -> requests.Session:
+        """Get the process-wide authenticated Jenkins session."""
+        if self._jenkins_session is None:
+            self._jenkins_session = get_jenkins_session(self.jenkins_base, self.jenkins_user, self.jenkins_token)
+        return self._jenkins_session
+    
+    def execute(self, branch: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Execute the query tool for a specific branch.
         
         Args:
             branch: Branch name to query
+            force_refresh: Query Splunk even if a recent result is cached
             
         Returns:
             Dict with branch status and formatted output
@@ -96,7 +184,7 @@ class QueryTool:
         config = self.BRANCHES[branch_lower]
         
         try:
-            result = self._query_branch(config)
+            result = self._query_branch(config, force_refresh)
             formatted = self._format_branch_status(result)
             
             return {
@@ -106,38 +194,47 @@ class QueryTool:
             }
         
         except Exception as e:
-            logger.exception(f"Error querying branch {branch}: {e}")
-            return {
-                "error": str(e),
-                "formatted_output": f"❌ Error querying {branch}: {e}"
-            }
+            logger.exception("Error querying branch %s", branch)
+            error = e
+        
+        return {
+            "error": str(error),
+            "formatted_output": f"❌ Error querying {branch}: {error}"
+        }
     
-    def list_failures(self) -> Dict[str, Any]:
+    def list_failures(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         List all failing branches.
         
+        Args:
+            force_refresh: Query Splunk even if recent results are cached
+        
         Returns:
             Dict with all branch statuses and failures
         """
         results = []
         failures = []
         
-        for branch_key, config in self.BRANCHES.items():
-            # Skip aliases
-            if branch_key in ("cairo",):
-                continue
-            
+        # Skip aliases
+        branches = {k: c for k, c in self.BRANCHES.items() if k not in ("cairo",)}
+        
+        # Branch queries are independent and network-bound: run them together
+        # and collect in branch order
+        with ThreadPoolExecutor(max_workers=len(branches), thread_name_prefix="query-branch") as pool:
+            futures = {k: pool.submit(self._query_branch, c, force_refresh) for k, c in branches.items()}
+        
+        for branch_key, future in futures.items():
             try:
-                result = self._query_branch(config)
+                result = future.result()
                 results.append(result)
                 
                 if result.get("status") != "✅ SUCCESS":
                     failures.append(result)
             
             except Exception as e:
-                logger.error(f"Error querying {branch_key}: {e}")
+                logger.warning("Error querying %s: %s", branch_key, e)
                 failures.append({
-                    "branch": config["name"],
+                    "branch": branches[branch_key]["name"],
                     "status": "❌ ERROR",
                     "error": str(e)
                 })
@@ -151,21 +248,30 @@ class QueryTool:
             "formatted_output": formatted
         }
     
-    def _query_branch(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _query_branch(self, config: Dict[str, Any], force_refresh: bool = False) -> Dict[str, Any]:
+        """Get a branch's status, reusing a result from the last BRANCH_CACHE_TTL seconds."""
+        key = config["splunk_filter"]
+        if not force_refresh:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                # An alias may have filled the entry: report under this branch's name
+                return {**cached, "branch": config["name"], "display_name": config["display_name"]}
+        
+        result = self._fetch_branch_status(config)
+        # No data may just be a Splunk hiccup: ask again next time
+        if result.get("status") != "⚠️ NO DATA":
+            with self._cache_lock:
+                self._cache[key] = result
+        return result
+    
+    def _fetch_branch_status(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Query Splunk for a branch's status."""
         branch_name = config["name"]
         splunk_filter = config["splunk_filter"]
         
         # Build Splunk search query
-        search_query = f"""
-        search index=ci_builds {splunk_filter} earliest=-24h
-        | head 1
-        | eval Review=Review
-        | eval make_status=coalesce(make_result, "UNKNOWN")
-        | eval bazel_status=coalesce(bazel_result, "UNKNOWN")
-        | table Review, make_status, bazel_status, make_url, bazel_url, make_duration, bazel_duration
-        """
-        
+        search_query = self.SPLUNK_QUERY.format(splunk_filter=splunk_filter)
         splunk_data = self._execute_splunk_search(search_query)
         
         if not splunk_data:
@@ -208,10 +314,16 @@ class QueryTool:
                 "error": None
             }
         
+        # The Swarm and Jenkins checks are independent: fetch the Jenkins
+        # error in the background while Swarm is asked about the review
+        failed_url = make_url if make_status != "SUCCESS" else bazel_url
+        jenkins_future = _CHECK_POOL.submit(self._check_jenkins_error, failed_url)
+        
         # Check for delta change
         if review:
             is_delta = self._check_swarm_delta(review)
             if is_delta:
+                jenkins_future.cancel()
                 return {
                     **base_result,
                     "status": "⚠️ DELTA CHANGE",
@@ -219,8 +331,7 @@ class QueryTool:
                 }
         
         # Check Jenkins for error details
-        failed_url = make_url if make_status != "SUCCESS" else bazel_url
-        jenkins_error = self._check_jenkins_error(failed_url)
+        jenkins_error = jenkins_future.result()
         
         if jenkins_error:
             return {
@@ -236,8 +347,26 @@ class QueryTool:
             "error": "Build failed without specific error pattern"
         }
     
-    def _execute_splunk_search(self, query: str) -> Optional[Dict[str, Any]]:
-        """Execute a Splunk search and return results."""
+    def _execute_splunk_search(
+        self,
+        query: str,
+        earliest: str = "-24h",
+        latest: str = "now"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Execute a Splunk search and return its first result.
+        
+        The time range is sent as job parameters rather than in the SPL, so
+        Splunk can skip buckets outside it from the time index.
+        
+        Args:
+            query: Splunk search query (SPL)
+            earliest: Earliest time for search
+            latest: Latest time for search
+        
+        Returns:
+            First result dict, or None
+        """
         if not self.splunk_host or not self.splunk_token:
             logger.warning("Splunk credentials not configured")
             return None
@@ -248,42 +377,41 @@ class QueryTool:
         }
         
         try:
-            # Create search job
-            create_url = f"{self.splunk_host}/services/search/jobs"
-            r = requests.post(
-                create_url,
+            # The export endpoint runs the search and streams its results
+            # back in the same request: no job to create and poll
+            export_url = f"{self.splunk_host}/services/search/jobs/export"
+            with self.session.post(
+                export_url,
                 headers=headers,
-                data={"search": query, "output_mode": "json"},
-                timeout=30,
-                verify=False
-            )
-            
-            if r.status_code != 201:
-                logger.error(f"Splunk search creation failed: {r.status_code}")
-                return None
-            
-            job_id = r.json().get("sid")
-            
-            # Wait for job completion
-            results_url = f"{self.splunk_host}/services/search/jobs/{job_id}/results"
-            for _ in range(30):  # 30 second timeout
-                time.sleep(1)
-                r = requests.get(
-                    results_url,
-                    headers=headers,
-                    params={"output_mode": "json"},
-                    timeout=10,
-                    verify=False
-                )
+                data={
+                    "search": query,
+                    "earliest_time": earliest,
+                    "latest_time": latest,
+                    "output_mode": "json_rows"
+                },
+                stream=True,
+                timeout=self.SEARCH_TIMEOUT,
+                verify=self.splunk_verify
+            ) as r:
+                if r.status_code != 200:
+                    logger.error(f"Splunk search failed: {r.status_code}")
+                    return None
+                logger.debug("Splunk export Content-Encoding: %s", r.headers.get("Content-Encoding"))
                 
-                if r.status_code == 200:
-                    results = r.json().get("results", [])
-                    return results[0] if results else None
+                # One compact payload per line: field names are sent once,
+                # {"preview": false, "fields": [...], "rows": [[...]]}
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    payload = json_loads(line)
+                    rows = payload.get("rows")
+                    if rows and not payload.get("preview"):
+                        return dict(zip(payload.get("fields", []), rows[0]))
             
             return None
         
-        except requests.RequestException as e:
-            logger.error(f"Splunk request failed: {e}")
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Splunk request failed: %s", e)
             return None
     
     def _check_swarm_delta(self, review: str) -> bool:
@@ -291,27 +419,47 @@ class QueryTool:
         if not self.swarm_base or not self.swarm_token or not review:
             return False
         
+        # A review's files are fixed once its build ran: no TTL needed
+        with self._cache_lock:
+            is_delta = self._swarm_delta_cache.get(review)
+        if is_delta is None:
+            is_delta = self._fetch_swarm_delta(review)
+            if is_delta is None:
+                return False
+            with self._cache_lock:
+                self._swarm_delta_cache[review] = is_delta
+        return is_delta
+    
+    def _fetch_swarm_delta(self, review: str) -> Optional[bool]:
+        """Ask Swarm whether a review is a delta change (None if Swarm failed)."""
         try:
             headers = {"Authorization": f"token {self.swarm_token}"}
             url = f"{self.swarm_base}/api/v9/reviews/{review}/files"
             
-            r = requests.get(url, headers=headers, timeout=10)
+            # Only the paths are needed, not each file's revision metadata
+            r = self.session.get(
+                url,
+                headers=headers,
+                params={"fields": "depotFile"},
+                timeout=self.REQUEST_TIMEOUT
+            )
             if r.status_code != 200:
-                return False
-            
-            files = r.json().get("files", [])
+                return None
             
-            # Check if any files are bazel-related
-            for f in files:
-                path = f.get("depotFile", "").lower()
-                if ".bazel" in path or "BUILD" in path or path.endswith(".bzl"):
-                    return False
+            files = response_json(r).get("files", [])
             
-            # Only Makefile changes
-            return True
+            # Only Makefile changes: no bazel-related file in the review
+            return not any(self._is_bazel_file(f.get("depotFile", "")) for f in files)
         
-        except requests.RequestException:
-            return False
+        except requests.RequestException as e:
+            logger.warning("Swarm request for review %s failed: %s", review, e)
+            return None
+    
+    @staticmethod
+    def _is_bazel_file(depot_file: str) -> bool:
+        """Check if a depot path is a Bazel file (*.bazel, *.bzl or BUILD)."""
+        path = depot_file.lower()
+        return ".bazel" in path or path.endswith(".bzl") or path.rsplit("/", 1)[-1] == "build"
     
     def _check_jenkins_error(self, build_url: str) -> Optional[str]:
         """Check Jenkins for greperror artifact."""
@@ -321,65 +469,62 @@ class QueryTool:
         try:
             # Try to fetch greperror artifact
             error_url = f"{build_url}/artifact/greperror.txt"
-            r = requests.get(
+            # Only the start of the log is shown: never download more than
+            # GREPERROR_MAX_BYTES, even if Jenkins ignores the Range
+            with self.jenkins_session.get(
                 error_url,
-                auth=(self.jenkins_user, self.jenkins_token),
-                timeout=10
-            )
-            
-            if r.status_code == 200 and r.text.strip():
-                return r.text.strip()
+                headers={"Range": f"bytes=0-{self.GREPERROR_MAX_BYTES - 1}"},
+                stream=True,
+                timeout=self.REQUEST_TIMEOUT
+            ) as r:
+                if r.status_code not in (200, 206):
+                    return None
+                head = r.raw.read(self.GREPERROR_MAX_BYTES, decode_content=True)
             
-            return None
+            text = head.decode(r.encoding or "utf-8", errors="replace").strip()
+            return text or None
         
-        except requests.RequestException:
+        except requests.RequestException as e:
+            logger.warning("Jenkins greperror request failed: %s", e)
             return None
     
     def _format_branch_status(self, result: Dict[str, Any]) -> str:
         """Format a single branch status for display."""
-        branch = result.get("display_name", result.get("branch", "Unknown"))
-        status = result.get("status", "Unknown")
-        make_st = result.get("make_status", "—")
-        bazel_st = result.get("bazel_status", "—")
-        review = result.get("review", "")
-        review_url = result.get("review_url", "")
-        error = result.get("error", "")
-        
-        lines = [
-            f"**{branch}** - {status}",
-            "",
-            f"• **Make:** {'✅' if make_st == 'SUCCESS' else '❌'} {make_st}",
-            f"• **Bazel:** {'✅' if bazel_st == 'SUCCESS' else '❌'} {bazel_st}",
-        ]
-        
+        get = result.get
+        branch = get("display_name", get("branch", "Unknown"))
+        make_st = get("make_status", "—")
+        bazel_st = get("bazel_status", "—")
+        review = get("review", "")
+        review_url = get("review_url", "")
+        error = get("error", "")
+        
+        review_line = ""
         if review:
-            if review_url:
-                lines.append(f"• **Review:** [CL#{review}]({review_url})")
-            else:
-                lines.append(f"• **Review:** CL#{review}")
-        
-        if error:
-            lines.extend(["", f"**Error:** {error}"])
-        
-        return "\n".join(lines)
+            review_ref = f"[CL#{review}]({review_url})" if review_url else f"CL#{review}"
+            review_line = f"\n• **Review:** {review_ref}"
+        
+        card = self._format_error_status_card if error else self._format_status_card
+        return card({
+            "branch": branch,
+            "status": get("status", "Unknown"),
+            "make_icon": "✅" if make_st == "SUCCESS" else "❌",
+            "make_status": make_st,
+            "bazel_icon": "✅" if bazel_st == "SUCCESS" else "❌",
+            "bazel_status": bazel_st,
+            "review_line": review_line,
+            "error": error
+        })
     
     def _format_failures_list(self, failures: List[Dict[str, Any]]) -> str:
         """Format failures list for display."""
         if not failures:
             return "✅ **All branches passing!**"
         
-        lines = [
-            f"❌ **{len(failures)} Branch(es) Failing**",
-            ""
-        ]
-        
+        entries = []
         for f in failures:
-            branch = f.get("display_name", f.get("branch", "Unknown"))
-            status = f.get("status", "")
-            error = f.get("error", "")
-            
-            lines.append(f"• **{branch}**: {status}")
-            if error:
-                lines.append(f"  └─ {error[:100]}")
+            get = f.get
+            entry = f"• **{get('display_name', get('branch', 'Unknown'))}**: {get('status', '')}"
+            error = get("error", "")
+            entries.append(f"{entry}\n  └─ {error[:100]}" if error else entry)
         
-        return "\n".join(lines)
+        return f"❌ **{len(failures)} Branch(es) Failing**\n\n" + "\n".join(entries)
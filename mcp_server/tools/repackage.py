@@ -11,6 +11,8 @@ from typing import Dict, Any, Optional
 
 import requests
 
+from mcp_server._http import get_jenkins_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +34,14 @@ class RepackageTool:
     
     required_params = []  # Can be triggered without params for interactive mode
     
+    # Success reply (a bound str.format, resolved once)
+    _format_success = (
+        "✅ **Repackage triggered successfully!**\n\n"
+        "• **Pipeline:** {pipeline}\n"
+        "• **Build #:** {build_number}\n\n"
+        "The repackage operation has been queued."
+    ).format
+    
     def __init__(self):
         self.jenkins_base = os.getenv("JENKINS_BASE_URL", "")
         self.jenkins_user = os.getenv("JENKINS_USER", "")
@@ -41,11 +51,9 @@ class RepackageTool:
     
     @property
     def session(self) -> requests.Session:
-        """Get authenticated requests session."""
+        """Get the shared authenticated Jenkins session."""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.auth = (self.jenkins_user, self.jenkins_token)
-            self._session.headers.update({"Accept": "application/json"})
+            self._session = get_jenkins_session(self.jenkins_base, self.jenkins_user, self.jenkins_token)
         return self._session
     
     def execute(
@@ -99,12 +107,7 @@ class RepackageTool:
                     "success": True,
                     "pipeline": pipeline,
                     "build_number": build_number,
-                    "formatted_output": (
-                        f"✅ **Repackage triggered successfully!**\n\n"
-                        f"• **Pipeline:** {pipeline}\n"
-                        f"• **Build #:** {build_number}\n\n"
-                        "The repackage operation has been queued."
-                    )
+                    "formatted_output": self._format_success(pipeline=pipeline, build_number=build_number)
                 }
             else:
                 error = result.get("error", "Unknown error")
@@ -115,12 +118,14 @@ class RepackageTool:
                 }
         
         except Exception as e:
-            logger.exception(f"Error triggering repackage: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "formatted_output": f"❌ Error triggering repackage: {e}"
-            }
+            logger.exception("Error triggering repackage of %s #%s", pipeline, build_number)
+            error = e
+        
+        return {
+            "success": False,
+            "error": str(error),
+            "formatted_output": f"❌ Error triggering repackage: {error}"
+        }
     
     def _trigger_repackage(self, pipeline: str, build_number: int) -> Dict[str, Any]:
         """
@@ -168,6 +173,7 @@ class RepackageTool:
                 }
         
         except requests.RequestException as e:
+            logger.warning("Repackage request for %s #%s failed: %s", pipeline, build_number, e)
             return {
                 "success": False,
                 "error": str(e)
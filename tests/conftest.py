@@ -0,0 +1,68 @@
+"""
+Shared pytest fixtures.
+
+Tool instances are built once per session for tests that only read
+configuration or call pure helpers. Tests that swap in mocked sessions or
+fill caches construct their own instance instead.
+
+The bot app is imported once with a test token and a mocked Webex API,
+so its webhook routes can be exercised without Webex credentials.
+"""
+
+import importlib
+import sys
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from mcp_server.tools.builds import BuildsTool
+from mcp_server.tools.metrics import MetricsTool
+from mcp_server.tools.query import QueryTool
+
+
+@pytest.fixture(scope="session")
+def metrics_tool() -> MetricsTool:
+    """Shared, read-only MetricsTool."""
+    return MetricsTool()
+
+
+@pytest.fixture(scope="session")
+def query_tool() -> QueryTool:
+    """Shared, read-only QueryTool."""
+    return QueryTool()
+
+
+@pytest.fixture(scope="session")
+def builds_tool() -> BuildsTool:
+    """Shared, read-only BuildsTool."""
+    return BuildsTool()
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Flask test client for the MCP server, reused across a module."""
+    from mcp_server.server import app
+    
+    app.testing = True
+    with app.test_client() as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def bot_app(tmp_path_factory):
+    """The bot.app module, imported with a test token and a mocked Webex API."""
+    api = MagicMock()
+    api.people.me.return_value = SimpleNamespace(emails=["bot@example.com"], id="bot-person-id")
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("WEBEX_BOT_TOKEN", "test-bot-token")
+        mp.delenv("WEBEX_BOT_EMAIL", raising=False)
+        mp.delenv("WEBEX_WEBHOOK_SECRET", raising=False)
+        # Keep the cached bot identity out of the real temp directory
+        mp.setattr(tempfile, "tempdir", str(tmp_path_factory.mktemp("bot")))
+        mp.setattr("webexteamssdk.WebexTeamsAPI", Mock(return_value=api))
+        sys.modules.pop("bot.app", None)
+        module = importlib.import_module("bot.app")
+    return module
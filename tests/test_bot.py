@@ -2,7 +2,12 @@
 Tests for Webex Bot functionality.
 """
 
+import hmac
+import json
+import queue
+
 import pytest
+import requests
 from unittest.mock import Mock, patch, MagicMock
 
 
@@ -75,26 +80,262 @@ class TestCommandHandler:
         assert pattern.match("/Help") is not None
         assert pattern.match("/HELP") is not None
     
-    @patch('bot.handlers.commands.requests')
-    def test_handle_metrics_success(self, mock_requests):
+    def test_patterns_are_precompiled(self):
+        """Test command patterns are compiled once, case-insensitive, on the class."""
+        import re
+        from bot.handlers.commands import CommandHandler
+        
+        names = [name for name in vars(CommandHandler) if name.endswith("_PATTERN")]
+        assert len(names) >= 8
+        for name in names:
+            pattern = getattr(CommandHandler, name)
+            assert isinstance(pattern, re.Pattern), name
+            assert pattern.flags & re.IGNORECASE, name
+    
+    def test_command_pattern_dispatch(self):
+        """Test the fused command pattern resolves each command by group name."""
+        from bot.handlers.commands import CommandHandler
+        
+        pattern = CommandHandler.COMMAND_PATTERN
+        
+        match = pattern.match("/metrics FXOS 11068")
+        assert match.lastgroup == "metrics"
+        assert match.group("metrics_job") == "FXOS"
+        assert match.group("metrics_build") == "11068"
+        
+        match = pattern.match("/query cairo")
+        assert match.lastgroup == "query"
+        assert match.group("query_branch") == "cairo"
+        
+        assert pattern.match("/build").lastgroup == "build"
+        assert pattern.match("/Repackage").lastgroup == "repackage"
+        assert pattern.match("/help").lastgroup == "help"
+        assert pattern.match("/metrics foo") is None
+    
+    def test_natural_language_patterns(self):
+        """Test the natural language patterns."""
+        from bot.handlers.commands import CommandHandler
+        
+        match = CommandHandler.NL_STATUS_PATTERN.search("Is Cairo passing?")
+        assert match.group("status_branch") == "Cairo"
+        
+        match = CommandHandler.NL_METRICS_PATTERN.search("show metrics for asa")
+        assert match.group("metrics_target") == "asa"
+    
+    def test_status_question_takes_precedence(self):
+        """Test a status question wins over an earlier metrics request in the same message."""
+        from bot.handlers.commands import CommandHandler
+        from bot.webex_client import WebexMessenger
+        
+        handler = CommandHandler(Mock(), Mock(spec=WebexMessenger))
+        handler._handle_query = Mock(return_value="fxos_19 status")
+        handler._handle_metrics = Mock(return_value="metrics")
+        
+        handler.handle_message(Mock(
+            text="get metrics for cairo, is fxos_19 failing",
+            roomId="room-1",
+            personEmail="a@b.c"
+        ))
+        
+        handler._handle_query.assert_called_once_with("fxos_19")
+        handler._handle_metrics.assert_not_called()
+    
+    def test_canonical_names(self):
+        """Test typed job types and branches map to canonical values."""
+        from bot.handlers.commands import CommandHandler
+        
+        handler = CommandHandler(Mock())
+        
+        assert handler._canonical_job_type("fxos") == "FXOS"
+        assert handler._canonical_job_type("aSa") == "ASA"
+        assert handler._canonical_job_type("cairo") is None
+        assert handler._canonical_branch("Cairo") == "cairo"
+        assert handler._canonical_branch("FXOS_19") is handler._canonical_branch("fxos_19")
+        assert handler._canonical_branch("Nightly") == "nightly"
+    
+    def test_handle_metrics_success(self):
         """Test successful metrics handling."""
         from bot.handlers.commands import CommandHandler
+        from bot.mcp_client import MCPClient
         
         # Mock Webex API
         mock_webex = Mock()
         handler = CommandHandler(mock_webex)
         
         # Mock MCP server response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        handler.mcp = Mock(spec=MCPClient)
+        handler.mcp.call.return_value = {
             "formatted_output": "🔧 **Jenkins Build Metrics**\n..."
         }
-        mock_requests.post.return_value = mock_response
         
         result = handler._handle_metrics("FXOS", 11068)
         
         assert "Jenkins Build Metrics" in result
+        handler.mcp.call.assert_called_once_with(
+            "get_metrics",
+            {"job_type": "FXOS", "build_number": 11068},
+            ttl=CommandHandler.BUILD_METRICS_TTL
+        )
+    
+    def test_help_reply_is_pre_encoded(self):
+        """Test /help is posted from the pre-encoded message body."""
+        import json
+        from bot.handlers.commands import CommandHandler, HELP_TEXT
+        from bot.webex_client import WebexMessenger
+        
+        messenger = Mock(spec=WebexMessenger)
+        handler = CommandHandler(Mock(), messenger)
+        
+        handler.handle_message(Mock(text="/help", roomId="room-1", personEmail="a@b.c"))
+        
+        body = messenger.send_json.call_args[0][0]
+        assert json.loads(body) == {"roomId": "room-1", "markdown": HELP_TEXT}
+        messenger.send.assert_not_called()
+
+
+class TestMCPClient:
+    """Test the shared MCP client."""
+    
+    def test_session_is_created_once_under_concurrency(self):
+        """Test concurrent first calls share one pooled session."""
+        from concurrent.futures import ThreadPoolExecutor
+        from bot.mcp_client import MCPClient
+        
+        client = MCPClient(base_url="http://mcp.example.com/")
+        
+        with patch("bot.mcp_client.requests.Session", side_effect=requests.Session) as session_cls:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                sessions = set(pool.map(lambda _: id(client.session), range(64)))
+        
+        assert len(sessions) == 1
+        assert session_cls.call_count == 1
+    
+    def test_call_raises_on_http_error(self):
+        """Test non-200 responses surface as HTTPError."""
+        import requests
+        from bot.mcp_client import MCPClient
+        
+        client = MCPClient(base_url="http://mcp.example.com/")
+        client._session = Mock(spec=requests.Session)
+        client._session.post.return_value = Mock(status_code=500)
+        
+        with pytest.raises(requests.HTTPError) as exc_info:
+            client.call("query_branch", {"branch": "cairo"})
+        
+        assert exc_info.value.response.status_code == 500
+        client._session.post.assert_called_once_with(
+            "http://mcp.example.com/tools/execute",
+            json={"tool": "query_branch", "args": {"branch": "cairo"}},
+            timeout=30
+        )
+    
+    def test_call_caches_successful_results(self):
+        """Test results are reused within the TTL and errors are not cached."""
+        from bot.mcp_client import MCPClient
+        
+        client = MCPClient(base_url="http://mcp.example.com")
+        client._session = Mock(spec=requests.Session)
+        client._session.post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value={"formatted_output": "ok"})
+        )
+        
+        assert client.call("query_branch", {"branch": "cairo"}, ttl=15) == {"formatted_output": "ok"}
+        assert client.call("query_branch", {"branch": "cairo"}, ttl=15) == {"formatted_output": "ok"}
+        assert client._session.post.call_count == 1
+        
+        client._session.post.return_value.json.return_value = {"error": "Unknown branch"}
+        client.call("query_branch", {"branch": "nope"}, ttl=15)
+        client.call("query_branch", {"branch": "nope"}, ttl=15)
+        assert client._session.post.call_count == 3
+    
+    def test_in_progress_build_metrics_are_not_cached(self):
+        """Test metrics rows without a duration (build still running) are never cached."""
+        from bot.mcp_client import MCPClient
+        
+        running = {"rows": [{"platform": "arm", "duration_mmss": None, "errors": []}]}
+        finished = {"rows": [{"platform": "arm", "duration_mmss": "24:00", "errors": []}]}
+        
+        assert not MCPClient._is_cacheable(running)
+        assert MCPClient._is_cacheable(finished)
+        
+        client = MCPClient(base_url="http://mcp.example.com")
+        client._session = Mock(spec=requests.Session)
+        client._session.post.return_value = Mock(status_code=200, json=Mock(return_value=running))
+        
+        client.call("get_metrics", {"job_type": "FXOS", "build_number": 7}, ttl=86400)
+        client.call("get_metrics", {"job_type": "FXOS", "build_number": 7}, ttl=86400)
+        assert client._session.post.call_count == 2
+    
+    def test_concurrent_calls_share_one_request(self):
+        """Test identical in-flight calls are collapsed into one POST."""
+        import threading
+        from bot.mcp_client import MCPClient
+        
+        client = MCPClient(base_url="http://mcp.example.com")
+        release = threading.Event()
+        
+        def slow_post(*args, **kwargs):
+            release.wait(timeout=5)
+            return Mock(status_code=200, json=Mock(return_value={"formatted_output": "ok"}))
+        
+        client._session = Mock(spec=requests.Session)
+        client._session.post.side_effect = slow_post
+        
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(client.call("query_branch", {"branch": "cairo"}, ttl=15))
+            )
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        while client._session.post.call_count == 0:
+            pass
+        release.set()
+        for t in threads:
+            t.join(timeout=5)
+        
+        assert results == [{"formatted_output": "ok"}] * 5
+        assert client._session.post.call_count == 1
+
+
+class TestWebexMessenger:
+    """Test the pooled Webex messenger."""
+    
+    def test_send_card_posts_adaptive_card(self):
+        """Test cards are posted as adaptive card attachments."""
+        from bot.webex_client import WebexMessenger
+        
+        messenger = WebexMessenger("token")
+        messenger._session = Mock(spec=requests.Session)
+        messenger._session.post.return_value = Mock(json=Mock(return_value={"id": "msg-1"}))
+        
+        result = messenger.send_card("room-1", "Pick one", {"type": "AdaptiveCard"})
+        
+        assert result == {"id": "msg-1"}
+        messenger._session.post.assert_called_once_with(
+            WebexMessenger.MESSAGES_URL,
+            json={
+                "roomId": "room-1",
+                "text": "Pick one",
+                "attachments": [{
+                    "contentType": "application/vnd.microsoft.card.adaptive",
+                    "content": {"type": "AdaptiveCard"}
+                }]
+            },
+            timeout=10
+        )
+    
+    def test_session_sends_bearer_token(self):
+        """Test the session is authenticated with the bot token."""
+        from bot.webex_client import WebexMessenger
+        
+        messenger = WebexMessenger("secret-token")
+        
+        assert messenger.session.headers["Authorization"] == "Bearer secret-token"
+        assert messenger.session is messenger.session
 
 
 class TestCardHandler:
@@ -120,6 +361,39 @@ class TestCardHandler:
         assert card["type"] == "AdaptiveCard"
         assert "FXOS_PB" in str(card)
     
+    def test_created_cards_are_not_shared(self):
+        """Test each create_* call returns an equal but separate card."""
+        from bot.handlers.cards import CardHandler
+        
+        card = CardHandler.create_pipeline_selection_card()
+        card["body"].append({"type": "TextBlock", "text": "extra"})
+        assert CardHandler.create_pipeline_selection_card() != card
+        
+        first = CardHandler.create_branch_selection_card("FXOS_PB")
+        second = CardHandler.create_branch_selection_card("FXOS_PB")
+        assert first == second
+        assert first is not second
+    
+    def test_selection_messages_are_pre_encoded(self):
+        """Test the pre-encoded card messages match the cards and rooms."""
+        from bot.handlers.cards import CardHandler
+        from bot.webex_client import WebexMessenger
+        
+        message = json.loads(CardHandler.pipeline_selection_message("room-1"))
+        assert message == {
+            "roomId": "room-1",
+            "text": "Select a pipeline to build",
+            "attachments": [{
+                "contentType": WebexMessenger.CARD_CONTENT_TYPE,
+                "content": CardHandler.create_pipeline_selection_card()
+            }]
+        }
+        
+        for pipeline in ("FXOS_PB", "UNKNOWN"):
+            message = json.loads(CardHandler.branch_selection_message("room-2", pipeline))
+            assert message["roomId"] == "room-2"
+            assert message["attachments"][0]["content"] == CardHandler.create_branch_selection_card(pipeline)
+    
     def test_create_build_confirmation_card(self):
         """Test build confirmation card creation."""
         from bot.handlers.cards import CardHandler
@@ -138,21 +412,114 @@ class TestCardHandler:
         
         assert facts is not None
         assert len(facts) == 2
+    
+    def test_handle_action_dispatch(self):
+        """Test card actions are routed by action_type."""
+        from bot.handlers.cards import CardHandler
+        from bot.webex_client import WebexMessenger
+        
+        handler = CardHandler(Mock(), Mock(spec=WebexMessenger))
+        
+        result = handler.handle_action(Mock(inputs={"action_type": "cancel"}, roomId="room-1"))
+        assert result == {"status": "cancelled"}
+        
+        result = handler.handle_action(Mock(inputs={"action_type": "bogus"}, roomId="room-1"))
+        assert result == {"status": "unknown_action", "action_type": "bogus"}
+        assert handler.messenger.send.call_count == 2
 
 
 class TestWebhookApp:
     """Test the Flask webhook app."""
     
-    @patch('bot.app.webex_api')
-    @patch('bot.app.command_handler')
-    def test_health_check(self, mock_cmd_handler, mock_webex):
+    @pytest.fixture
+    def webhook_client(self, bot_app, monkeypatch):
+        """Test client with a one-slot dispatch queue and no worker threads."""
+        monkeypatch.setattr(bot_app, "DISPATCH_QUEUE", queue.Queue(maxsize=1))
+        monkeypatch.setattr(bot_app, "start_dispatch_workers", lambda: None)
+        monkeypatch.setattr(bot_app, "webhook_secret", "")
+        monkeypatch.setattr(bot_app, "_SECRET_BYTES", b"")
+        return bot_app.app.test_client()
+    
+    @staticmethod
+    def _message_body(person_email="user@example.com", **data):
+        """Encoded messages/created webhook payload."""
+        return json.dumps({
+            "resource": "messages",
+            "event": "created",
+            "data": {"id": "msg-1", "roomId": "room-1", "personEmail": person_email, **data}
+        }).encode()
+    
+    def test_health_check(self, bot_app):
         """Test health check endpoint."""
-        from bot.app import app
-        
-        client = app.test_client()
+        client = bot_app.app.test_client()
         response = client.get("/health")
         
         assert response.status_code == 200
         data = response.get_json()
         assert data["status"] == "healthy"
         assert data["service"] == "pipeline-notify-bot"
+    
+    def test_webhook_is_queued(self, bot_app, webhook_client):
+        """Test a message webhook is acknowledged with 202 and queued."""
+        response = webhook_client.post("/webhook", data=self._message_body())
+        
+        assert response.status_code == 202
+        item = bot_app.DISPATCH_QUEUE.get_nowait()
+        assert (item["kind"], item["id"]) == ("messages", "msg-1")
+    
+    def test_webhook_queue_full(self, webhook_client):
+        """Test webhooks are refused with 503 while the dispatch queue is full."""
+        assert webhook_client.post("/webhook", data=self._message_body()).status_code == 202
+        
+        response = webhook_client.post("/webhook", data=self._message_body())
+        
+        assert response.status_code == 503
+        assert response.get_json()["reason"] == "queue full"
+    
+    def test_webhook_ignores_own_messages(self, bot_app, webhook_client):
+        """Test the bot's own messages are dropped without queueing a fetch."""
+        response = webhook_client.post("/webhook", data=self._message_body(bot_app.bot_email))
+        
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "ignored"
+        assert bot_app.DISPATCH_QUEUE.empty()
+    
+    def test_webhook_rejects_oversized_body(self, bot_app, webhook_client):
+        """Test bodies over the size limit are refused with 413."""
+        response = webhook_client.post("/webhook", data=b" " * (bot_app.WEBHOOK_MAX_BODY + 1))
+        
+        assert response.status_code == 413
+        assert bot_app.DISPATCH_QUEUE.empty()
+    
+    @pytest.mark.parametrize("signature", [None, "0" * 40])
+    def test_webhook_rejects_bad_signature(self, bot_app, webhook_client, monkeypatch, signature):
+        """Test a missing or wrong signature is refused with 401 when a secret is set."""
+        monkeypatch.setattr(bot_app, "webhook_secret", "secret")
+        monkeypatch.setattr(bot_app, "_SECRET_BYTES", b"secret")
+        headers = {"X-Spark-Signature": signature} if signature else {}
+        
+        response = webhook_client.post("/webhook", data=self._message_body(), headers=headers)
+        
+        assert response.status_code == 401
+        assert bot_app.DISPATCH_QUEUE.empty()
+    
+    def test_unsigned_payload_fields_are_not_trusted(self, bot_app, webhook_client):
+        """Test an unsigned webhook's text is ignored and the message is fetched by ID."""
+        body = self._message_body(text="/build FXOS_PB main")
+        
+        assert webhook_client.post("/webhook", data=body).status_code == 202
+        
+        assert bot_app.DISPATCH_QUEUE.get_nowait()["event"] is None
+    
+    def test_signed_payload_fields_are_used(self, bot_app, webhook_client, monkeypatch):
+        """Test a verified webhook's payload fields are handed to the handlers."""
+        monkeypatch.setattr(bot_app, "webhook_secret", "secret")
+        monkeypatch.setattr(bot_app, "_SECRET_BYTES", b"secret")
+        body = self._message_body(text="/help")
+        signature = hmac.digest(b"secret", body, "sha1").hex()
+        
+        response = webhook_client.post("/webhook", data=body, headers={"X-Spark-Signature": signature})
+        
+        assert response.status_code == 202
+        event = bot_app.DISPATCH_QUEUE.get_nowait()["event"]
+        assert (event.roomId, event.personEmail, event.text) == ("room-1", "user@example.com", "/help")
@@ -2,271 +2,500 @@
 Tests for MCP Server functionality.
 """
 
-import pytest
+import logging
+import threading
 from unittest.mock import Mock, patch, MagicMock
-import os
+
+import requests
+import responses
+
+from config.settings import Settings
+from mcp_server.clients.jenkins_client import JenkinsClient
+from mcp_server.clients.splunk_client import SplunkClient
+from mcp_server.tools._queue_events import QueueEventListener
+from mcp_server.tools.builds import BuildsTool
+from mcp_server.tools.metrics import MetricsTool
+from mcp_server.tools.query import QueryTool
+from mcp_server.tools.repackage import RepackageTool
 
 
 class TestMetricsTool:
     """Test the metrics tool."""
     
-    def test_platforms_configuration(self):
-        """Test that platform configurations are correct."""
-        from mcp_server.tools.metrics import MetricsTool
-        
-        tool = MetricsTool()
-        
-        # Check FXOS platforms
-        assert len(tool.FXOS_PLATFORMS) == 9
-        platform_ids = [p["id"] for p in tool.FXOS_PLATFORMS]
-        assert "arm" in platform_ids
-        assert "fp4k" in platform_ids
+    def test_tool_initialization(self):
+        """Test tool initializes with injected credentials."""
+        tool = MetricsTool(
+            jenkins_base="https://jenkins.example.com",
+            jenkins_user="testuser",
+            jenkins_token="testtoken"
+        )
         
-        # Check ASA platforms
-        assert len(tool.ASA_PLATFORMS) == 4
-        platform_ids = [p["id"] for p in tool.ASA_PLATFORMS]
-        assert "arm" in platform_ids
-        assert "arm8" in platform_ids
+        assert tool.jenkins_base == "https://jenkins.example.com"
+        assert tool.jenkins_user == "testuser"
     
-    def test_format_duration(self):
-        """Test duration formatting."""
-        from mcp_server.tools.metrics import MetricsTool
+    def test_tool_initialization_from_env(self, monkeypatch):
+        """Test tool falls back to env vars."""
+        monkeypatch.setenv("JENKINS_BASE_URL", "https://jenkins.example.com")
+        monkeypatch.setenv("JENKINS_USER", "testuser")
         
         tool = MetricsTool()
         
-        assert tool._format_duration(65) == "01:05"
-        assert tool._format_duration(3661) == "61:01"
-        assert tool._format_duration(0) == "00:00"
+        assert tool.jenkins_base == "https://jenkins.example.com"
+        assert tool.jenkins_user == "testuser"
     
-    def test_build_regex_patterns(self):
-        """Test build time regex patterns."""
-        from mcp_server.tools.metrics import MetricsTool
+    def test_execute_keeps_platform_order(self):
+        """Test platforms fetched in parallel are reported in configured order."""
+        tool = MetricsTool()
+        tool._list_artifacts = Mock(return_value=None)
+        tool._fetch_outfile = Mock(return_value=(200, {"start": None, "end": None, "hit": None, "total": None}))
+        tool._get_artifact = Mock(return_value=(404, ""))
+        
+        result = tool.execute("FXOS", build_number=11068)
         
+        assert [r["platform"] for r in result["rows"]] == list(tool.FXOS_PLATFORMS)
+        assert all(r["errors"] == ["Cache: HTTP 404"] for r in result["rows"])
+        assert tool._fetch_outfile.call_count == 9
+    
+    def test_artifacts_and_latest_build_are_cached(self):
+        """Test repeat queries reuse artifacts and the latest build number."""
+        tool = MetricsTool()
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.side_effect = [
+            Mock(status_code=200, headers={}, text="BUILD_TIME_START: x"),
+            Mock(status_code=404, headers={}, text="Not found"),
+            Mock(status_code=404, headers={}, text="Not found"),
+            Mock(status_code=200, content=b'{"lastBuild": {"number": 7}}'),
+        ]
+        
+        assert tool._get_artifact("https://j/a.txt") == (200, "BUILD_TIME_START: x")
+        assert tool._get_artifact("https://j/a.txt") == (200, "BUILD_TIME_START: x")
+        assert tool._get_artifact("https://j/b.txt") == (404, "")
+        assert tool._get_artifact("https://j/b.txt") == (404, "")
+        assert tool._get_latest_build("job/FXOS") == ("lastBuild", 7)
+        assert tool._get_latest_build("job/FXOS") == ("lastBuild", 7)
+        assert tool._session.get.call_count == 4
+    
+    def test_stale_artifacts_are_revalidated(self):
+        """Test an old cache entry is revalidated with a conditional GET."""
+        tool = MetricsTool()
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.side_effect = [
+            Mock(status_code=200, headers={"ETag": '"abc"', "Last-Modified": "Tue, 25 Nov 2025 05:45:30 GMT"}, text="hits"),
+            Mock(status_code=304, headers={}),
+        ]
+        
+        assert tool._get_artifact("https://j/a.txt") == (200, "hits")
+        
+        tool.ARTIFACT_REVALIDATE_AFTER = 0
+        assert tool._get_artifact("https://j/a.txt") == (200, "hits")
+        assert tool._session.get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Tue, 25 Nov 2025 05:45:30 GMT"
+        }
+    
+    def test_unlisted_artifacts_are_not_fetched(self):
+        """Test artifacts missing from the build listing cost no request."""
         tool = MetricsTool()
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.return_value = Mock(
+            status_code=200,
+            content=b'{"artifacts": [{"relativePath": "ARMsa/image/bazel_cache.txt"}]}'
+        )
         
-        test_text = """
-        Some log output
-        BUILD_TIME_START: Tue Nov 25 05:21:30 UTC 2025
-        Building...
-        BUILD_TIME_END: Tue Nov 25 05:45:30 UTC 2025
-        Done
-        """
+        artifacts = tool._list_artifacts("job/FXOS", 7)
+        assert list(artifacts) == ["ARMsa/image/bazel_cache.txt"]
+        assert artifacts["ARMsa/image/bazel_cache.txt"].endswith("/job/FXOS/7/artifact/ARMsa/image/bazel_cache.txt")
         
-        start, end = tool._parse_build_times(test_text)
+        tool._session.get.reset_mock()
+        platform = tool.FXOS_PLATFORMS["armv"]
+        fetches = tool._submit_platform_fetches("job/FXOS", 7, platform, "FXOS", artifacts)
+        row = tool._platform_row(platform, "FXOS", fetches)
         
-        assert start == "Tue Nov 25 05:21:30 UTC 2025"
-        assert end == "Tue Nov 25 05:45:30 UTC 2025"
+        assert row["errors"] == ["Outfile: missing", "Cache: missing"]
+        tool._session.get.assert_not_called()
     
-    @patch.dict(os.environ, {
-        "JENKINS_BASE_URL": "https://jenkins.example.com",
-        "JENKINS_USER": "testuser",
-        "JENKINS_API_TOKEN": "testtoken"
-    })
-    def test_tool_initialization(self):
-        """Test tool initializes with env vars."""
-        from mcp_server.tools.metrics import MetricsTool
-        
+    def test_scan_outfile_stops_early(self, metrics_tool):
+        """Test outfile scanning stops once every needed value is found."""
+        def lines():
+            yield "BUILD_TIME_START: Tue Nov 25 05:21:30 UTC 2025"
+            yield "INFO: Elapsed time: 10.5s"
+            yield "INFO: 100 processes: 90 remote cache hit"
+            yield "INFO: Elapsed time: 20.1s"
+            yield "INFO: 15030 processes: 14875 remote cache hit"
+            yield "BUILD_TIME_END: Tue Nov 25 05:45:30 UTC 2025"
+            raise AssertionError("read past the last needed line")
+        
+        scan = metrics_tool._scan_outfile(lines(), "ASA")
+        
+        assert scan == {
+            "start": "Tue Nov 25 05:21:30 UTC 2025",
+            "end": "Tue Nov 25 05:45:30 UTC 2025",
+            "hit": 14875,
+            "total": 15030
+        }
+    
+    def test_fxos_outfile_is_fetched_by_range(self):
+        """Test FXOS outfiles are read from their head and tail only."""
         tool = MetricsTool()
-        
-        assert tool.jenkins_base == "https://jenkins.example.com"
-        assert tool.jenkins_user == "testuser"
+        tool._session = Mock(spec=requests.Session)
+        head = Mock(status_code=206, headers={}, encoding="utf-8")
+        head.iter_lines.return_value = iter(["BUILD_TIME_START: Tue Nov 25 05:21:30 UTC 2025", "INFO: Analyzed"])
+        tail = MagicMock(status_code=206, headers={}, encoding="utf-8")
+        tail.__enter__.return_value = tail
+        tail.iter_lines.return_value = iter(["INFO: Build completed", "BUILD_TIME_END: Tue Nov 25 05:45:30 UTC 2025"])
+        tool._session.get.side_effect = [head, tail]
+        
+        status, scan = tool._fetch_outfile("https://j/1/artifact/ARMsa/outfile", "FXOS")
+        
+        assert status == 200
+        assert scan["start"] == "Tue Nov 25 05:21:30 UTC 2025"
+        assert scan["end"] == "Tue Nov 25 05:45:30 UTC 2025"
+        ranges = [c.kwargs["headers"]["Range"] for c in tool._session.get.call_args_list]
+        assert ranges == [tool.OUTFILE_HEAD_RANGE, tool.OUTFILE_TAIL_RANGE]
 
 
 class TestQueryTool:
     """Test the query tool."""
     
-    def test_branch_configurations(self):
-        """Test branch configurations."""
-        from mcp_server.tools.query import QueryTool
+    def test_splunk_search_uses_export(self):
+        """Test a branch search is a single streamed export request."""
+        tool = QueryTool()
+        tool._session = Mock(spec=requests.Session)
+        mock_post = tool._session.post
+        tool.splunk_host = "https://splunk.example.com:8089"
+        tool.splunk_token = "token"
+        
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = [
+            b'{"preview": true, "fields": ["Review"], "rows": [["1"]]}',
+            b"",
+            b'{"preview": false, "init_offset": 0, "fields": ["Review", "make_status"], "rows": [["12345", "SUCCESS"]]}',
+        ]
+        mock_post.return_value = response
+        
+        result = tool._execute_splunk_search("search index=ci_builds | head 1")
+        
+        assert result == {"Review": "12345", "make_status": "SUCCESS"}
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args[0].endswith("/services/search/jobs/export")
+        assert mock_post.call_args.kwargs["data"]["earliest_time"] == "-24h"
+    
+    def test_requests_accept_compressed_responses(self):
+        """Test per-call headers keep the session's gzip Accept-Encoding."""
+        tool = QueryTool()
+        request = tool.session.prepare_request(requests.Request(
+            "POST",
+            "https://splunk.example.com/services/search/jobs/export",
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        ))
         
+        assert "gzip" in request.headers["Accept-Encoding"]
+    
+    def test_list_failures_queries_branches_concurrently(self):
+        """Test list_failures keeps branch order and reports errors per branch."""
         tool = QueryTool()
+        barrier = threading.Barrier(3, timeout=5)
         
-        assert "fxos_19" in tool.BRANCHES
-        assert "cairo" in tool.BRANCHES
-        assert "lina" in tool.BRANCHES
+        def query_branch(config, force_refresh=False):
+            barrier.wait()  # only passes if all three queries run at once
+            if config["name"] == "fxos_18":
+                raise RuntimeError("splunk down")
+            status = "✅ SUCCESS" if config["name"] == "fxos_19" else "⚠️ NO DATA"
+            return {"branch": config["name"], "status": status}
         
-        # Check cairo is an alias for lina
-        cairo_config = tool.BRANCHES["cairo"]
-        assert cairo_config["splunk_filter"] == 'branch="cairo"'
-    
-    def test_format_branch_status_success(self):
-        """Test formatting successful branch status."""
-        from mcp_server.tools.query import QueryTool
+        with patch.object(tool, "_query_branch", side_effect=query_branch):
+            result = tool.list_failures()
         
+        assert result["total_branches"] == 2
+        assert [f["branch"] for f in result["failures"]] == ["fxos_18", "lina"]
+        assert result["failures"][0]["status"] == "❌ ERROR"
+    
+    def test_branch_results_are_cached(self):
+        """Test repeat queries (and aliases) reuse a recent branch result."""
         tool = QueryTool()
+        splunk_data = {"Review": "12345", "make_status": "SUCCESS", "bazel_status": "SUCCESS"}
+        
+        with patch.object(tool, "_execute_splunk_search", return_value=splunk_data) as mock_search:
+            tool.execute("lina")
+            cairo = tool.execute("cairo")
+            assert mock_search.call_count == 1
+            assert cairo["data"]["display_name"] == "Cairo"
+            
+            tool.execute("lina", force_refresh=True)
+            assert mock_search.call_count == 2
+    
+    def test_failure_checks_run_concurrently(self):
+        """Test the Swarm and Jenkins checks of a failing branch overlap."""
+        tool = QueryTool()
+        jenkins_started = threading.Event()
+        splunk_data = {"Review": "12345", "make_status": "FAILURE", "bazel_status": "SUCCESS", "make_url": "https://j/1"}
         
-        result = {
-            "display_name": "FXOS 2.19",
-            "status": "✅ SUCCESS",
-            "make_status": "SUCCESS",
-            "bazel_status": "SUCCESS",
-            "review": "12345",
-            "review_url": "https://swarm.example.com/reviews/12345",
-            "error": None
-        }
+        def check_jenkins(url):
+            jenkins_started.set()
+            return "error: missing dependency"
         
-        formatted = tool._format_branch_status(result)
+        def check_swarm(review):
+            assert jenkins_started.wait(5)  # Jenkins was asked before Swarm answered
+            return False
         
-        assert "FXOS 2.19" in formatted
-        assert "SUCCESS" in formatted
-        assert "12345" in formatted
-    
-    def test_format_branch_status_failure(self):
-        """Test formatting failed branch status."""
-        from mcp_server.tools.query import QueryTool
+        with patch.object(tool, "_execute_splunk_search", return_value=splunk_data), \
+                patch.object(tool, "_check_jenkins_error", side_effect=check_jenkins), \
+                patch.object(tool, "_check_swarm_delta", side_effect=check_swarm):
+            result = tool._query_branch(tool.BRANCHES["fxos_19"])
         
+        assert result["status"] == "❌ PLATFORM FAILURE"
+        assert result["error"] == "error: missing dependency"
+    
+    def test_jenkins_error_reads_only_the_head(self):
+        """Test greperror.txt is fetched with a Range and read up to the cap."""
         tool = QueryTool()
+        tool.jenkins_user = "user"
+        tool.jenkins_token = "token"
+        tool._jenkins_session = Mock(spec=requests.Session)
+        
+        response = MagicMock(status_code=200, encoding=None)
+        response.__enter__.return_value = response
+        response.raw.read.return_value = b"  ERROR: undefined reference  \n"
+        tool._jenkins_session.get.return_value = response
+        
+        assert tool._check_jenkins_error("https://j/job/x/1") == "ERROR: undefined reference"
+        assert tool._jenkins_session.get.call_args.kwargs["headers"] == {"Range": "bytes=0-8191"}
+        response.raw.read.assert_called_once_with(tool.GREPERROR_MAX_BYTES, decode_content=True)
+    
+    def test_jenkins_session_is_shared(self):
+        """Test QueryTool and RepackageTool use one Jenkins connection pool."""
+        assert QueryTool().jenkins_session is RepackageTool().session
+    
+    def test_swarm_delta_is_cached_per_review(self):
+        """Test a review's file list is fetched from Swarm only once."""
+        tool = QueryTool()
+        tool.swarm_base = "https://swarm.example.com"
+        tool.swarm_token = "token"
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.return_value = Mock(
+            status_code=200,
+            content=b'{"files": [{"depotFile": "//depot/Makefile"}]}'
+        )
         
-        result = {
-            "display_name": "Cairo",
-            "status": "❌ PLATFORM FAILURE",
-            "make_status": "FAILURE",
-            "bazel_status": "SUCCESS",
-            "review": "12345",
-            "review_url": "",
-            "error": "Build failed: missing dependency"
-        }
+        assert tool._check_swarm_delta("12345") is True
+        assert tool._check_swarm_delta("12345") is True
+        assert tool._session.get.call_count == 1
+        assert tool._session.get.call_args.kwargs["params"] == {"fields": "depotFile"}
+    
+    def test_splunk_timeout_logs_warning_without_traceback(self, caplog):
+        """Test a Splunk timeout is logged as a warning without a traceback."""
+        tool = QueryTool()
+        tool.splunk_host = "https://splunk.example.com:8089"
+        tool.splunk_token = "token"
+        tool._session = Mock(spec=requests.Session)
+        tool._session.post.side_effect = requests.Timeout("read timed out")
+        
+        with caplog.at_level(logging.WARNING, logger="mcp_server.tools.query"):
+            assert tool._execute_splunk_search("search index=x") is None
+        
+        record = caplog.records[-1]
+        assert record.levelno == logging.WARNING
+        assert record.getMessage() == "Splunk request failed: read timed out"
+        assert record.exc_info is None
+    
+    def test_unexpected_errors_log_traceback_once(self, caplog):
+        """Test unexpected errors log a traceback without repeating the exception in the message."""
+        tool = QueryTool()
         
-        formatted = tool._format_branch_status(result)
+        with patch.object(tool, "_query_branch", side_effect=KeyError("make_status")):
+            with caplog.at_level(logging.ERROR, logger="mcp_server.tools.query"):
+                tool.execute("cairo")
         
-        assert "Cairo" in formatted
-        assert "PLATFORM FAILURE" in formatted
-        assert "missing dependency" in formatted
+        record = caplog.records[-1]
+        assert record.getMessage() == "Error querying branch cairo"
+        assert record.exc_info is not None
 
 
 class TestBuildsTool:
     """Test the builds tool."""
     
-    def test_pipeline_configurations(self):
-        """Test pipeline configurations."""
-        from mcp_server.tools.builds import BuildsTool
-        
+    @patch('mcp_server.tools.builds.time.sleep')
+    def test_wait_for_build_number_backs_off(self, mock_sleep):
+        """Test queue polling starts fast, backs off and honours Retry-After."""
         tool = BuildsTool()
-        
-        assert "FXOS_PB" in tool.PIPELINES
-        assert "ASA" in tool.PIPELINES
-        
-        fxos_config = tool.PIPELINES["FXOS_PB"]
-        assert fxos_config["job_path_env"] == "JENKINS_JOB_PATH_FXOS_PB"
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.side_effect = [
+            Mock(status_code=200, headers={}, content=b'{"buildable": true}'),
+            Mock(status_code=200, headers={}, content=b'{"buildable": true}'),
+            Mock(status_code=200, headers={"Retry-After": "1"}, content=b'{"blocked": true}'),
+            Mock(status_code=200, headers={}, content=b'{"executable": {"number": 42}}'),
+        ]
+        
+        assert tool._wait_for_build_number("123") == 42
+        assert [round(c.args[0], 1) for c in mock_sleep.call_args_list] == [0.2, 0.4, 1.0]
     
-    def test_invalid_pipeline(self):
-        """Test handling of invalid pipeline."""
-        from mcp_server.tools.builds import BuildsTool
-        
+    def test_wait_for_build_number_stops_when_cancelled(self):
+        """Test a cancelled queue item ends polling immediately."""
         tool = BuildsTool()
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.return_value = Mock(
+            status_code=200, headers={}, content=b'{"cancelled": true, "buildable": true}'
+        )
         
-        result = tool.execute("INVALID_PIPELINE", "main")
+        assert tool._wait_for_build_number("123") is None
+        assert tool._session.get.call_count == 1
+    
+    def test_queue_events_resolve_build_number(self):
+        """Test SSE run-started events resolve the matching queue item."""
+        listener = QueueEventListener(Mock(), "https://jenkins.example.com/")
+        listener._thread = Mock()  # do not open a real stream
+        
+        future = listener.watch("123")
+        listener._dispatch({"jenkins_event": "job_run_queue_enter", "job_run_queueId": "123"})
+        assert not future.done()
+        
+        listener._dispatch({"jenkins_event": "job_run_started", "job_run_queueId": 123, "jenkins_object_id": "42"})
+        assert future.result(timeout=1) == 42
+        assert listener._waiters == {}
+    
+    def test_queue_events_ignore_non_object_data(self):
+        """Test SSE data lines that are not JSON objects are skipped."""
+        listener = QueueEventListener(Mock(), "https://jenkins.example.com/")
+        listener._thread = Mock()  # do not open a real stream
+        
+        future = listener.watch("123")
+        listener._dispatch(["job_run_started"])
+        listener._dispatch("ping")
+        assert not future.done()
+    
+    def test_wait_for_build_number_polls_until_subscribed(self):
+        """Test the queue is polled while the SSE subscription is not live."""
+        tool = BuildsTool()
+        tool.SSE_READY_TIMEOUT = 0
+        tool._session = Mock(spec=requests.Session)
+        tool._session.get.return_value = Mock(
+            status_code=200, headers={}, content=b'{"executable": {"number": 42}}'
+        )
+        listener = tool._queue_events = QueueEventListener(tool._session, "https://jenkins.example.com/")
+        listener._thread = Mock()  # subscription never comes up
         
-        assert "error" in result
-        assert "Unknown pipeline" in result["error"]
-
-
-class TestMCPServer:
-    """Test the MCP server."""
-    
-    @patch('mcp_server.server.metrics_tool')
-    @patch('mcp_server.server.query_tool')
-    @patch('mcp_server.server.builds_tool')
-    @patch('mcp_server.server.repackage_tool')
-    def test_health_endpoint(self, mock_repack, mock_builds, mock_query, mock_metrics):
-        """Test health check endpoint."""
-        from mcp_server.server import app
-        
-        client = app.test_client()
-        response = client.get("/health")
-        
-        assert response.status_code == 200
-        data = response.get_json()
-        assert data["status"] == "healthy"
-        assert "tools" in data
-    
-    @patch('mcp_server.server.metrics_tool')
-    @patch('mcp_server.server.query_tool')
-    @patch('mcp_server.server.builds_tool')
-    @patch('mcp_server.server.repackage_tool')
-    def test_list_tools_endpoint(self, mock_repack, mock_builds, mock_query, mock_metrics):
-        """Test tools listing endpoint."""
-        # Setup mocks
-        mock_metrics.description = "Get metrics"
-        mock_metrics.parameters = {}
-        mock_query.description = "Query branch"
-        mock_query.parameters = {}
-        mock_builds.description = "Start build"
-        mock_builds.parameters = {}
-        mock_repack.description = "Repackage"
-        mock_repack.parameters = {}
-        
-        from mcp_server.server import app
-        
-        client = app.test_client()
-        response = client.get("/tools")
-        
-        assert response.status_code == 200
-        data = response.get_json()
-        assert "tools" in data
+        assert tool._wait_for_build_number("123") == 42
+        assert listener._waiters == {}
 
 
 class TestJenkinsClient:
     """Test the Jenkins client."""
     
-    @patch.dict(os.environ, {
-        "JENKINS_BASE_URL": "https://jenkins.example.com",
-        "JENKINS_USER": "testuser",
-        "JENKINS_API_TOKEN": "testtoken"
-    })
-    def test_client_initialization(self):
-        """Test client initializes with env vars."""
-        from mcp_server.clients.jenkins_client import JenkinsClient
+    def test_client_initialization(self, monkeypatch):
+        """Test client initializes from env-loaded settings."""
+        monkeypatch.setenv("JENKINS_BASE_URL", "https://jenkins.example.com")
+        monkeypatch.setenv("JENKINS_USER", "testuser")
+        monkeypatch.setenv("JENKINS_API_TOKEN", "testtoken")
         
-        client = JenkinsClient()
+        client = JenkinsClient(settings=Settings())
         
         assert client.base_url == "https://jenkins.example.com"
         assert client.user == "testuser"
     
+    @responses.activate
     def test_session_creation(self):
-        """Test session is created with auth."""
-        from mcp_server.clients.jenkins_client import JenkinsClient
-        
+        """Test the session is created on first use and sends basic auth."""
+        responses.add(responses.GET, "https://jenkins.example.com/job/FXOS/api/json", json={"name": "FXOS"})
         client = JenkinsClient(
             base_url="https://jenkins.example.com",
             user="testuser",
             token="testtoken"
         )
+        assert client._session is None
         
-        session = client.session
+        assert client.get_job_info("job/FXOS") == {"name": "FXOS"}
+        
+        request = responses.calls[0].request
+        assert request.headers["Authorization"].startswith("Basic ")
+        assert request.headers["Accept"] == "application/json"
+        assert client.session.get_adapter("https://jenkins.example.com").poolmanager.connection_pool_kw["maxsize"] == 32
+    
+    def test_session_is_shared_with_tools(self):
+        """Test clients and tools for the same Jenkins reuse one pooled session."""
+        client = JenkinsClient(base_url="https://jenkins.example.com", user="testuser", token="testtoken")
+        other = JenkinsClient(base_url="https://jenkins.example.com", user="testuser", token="testtoken")
+        tool = MetricsTool(
+            jenkins_base="https://jenkins.example.com",
+            jenkins_user="testuser",
+            jenkins_token="testtoken"
+        )
+        
+        assert client.session is other.session is tool.session
+    
+    def test_latest_build_number_requests_only_needed_fields(self):
+        """Test the latest build lookup asks Jenkins for lastBuild.number only."""
+        client = JenkinsClient(base_url="https://jenkins.example.com/", user="u", token="t")
+        client._session = Mock(spec=requests.Session)
+        client._session.get.return_value = Mock(
+            status_code=200,
+            content=b'{"lastBuild": {"number": 42}}'
+        )
         
-        assert session.auth == ("testuser", "testtoken")
-        assert "Accept" in session.headers
+        assert client.get_latest_build_number("job/FXOS/") == 42
+        client._session.get.assert_called_once_with(
+            "https://jenkins.example.com/job/FXOS/api/json",
+            params={"tree": "lastBuild[number]"},
+            timeout=15
+        )
+    
+    def test_job_info_is_cached_until_build_triggered(self):
+        """Test repeated job polls reuse the cached response until a trigger."""
+        client = JenkinsClient(base_url="https://jenkins.example.com", user="u", token="t")
+        client._session = Mock(spec=requests.Session)
+        client._session.get.return_value = Mock(status_code=200, content=b'{"building": true}')
+        client._session.post.return_value = Mock(status_code=201, headers={})
+        
+        assert client.is_building("job/FXOS", 7) is True
+        assert client.is_building("job/FXOS", 7) is True
+        assert client._session.get.call_count == 1
+        
+        client.trigger_build("job/FXOS")
+        client.is_building("job/FXOS", 7)
+        assert client._session.get.call_count == 2
 
 
 class TestSplunkClient:
     """Test the Splunk client."""
     
-    @patch.dict(os.environ, {
-        "SPLUNK_HOST": "https://splunk.example.com:8089",
-        "SPLUNK_TOKEN": "testtoken"
-    })
-    def test_client_initialization(self):
-        """Test client initializes with env vars."""
-        from mcp_server.clients.splunk_client import SplunkClient
+    def test_client_initialization(self, monkeypatch):
+        """Test client initializes from env-loaded settings."""
+        monkeypatch.setenv("SPLUNK_HOST", "https://splunk.example.com:8089")
+        monkeypatch.setenv("SPLUNK_TOKEN", "testtoken")
         
-        client = SplunkClient()
+        client = SplunkClient(settings=Settings())
         
         assert client.host == "https://splunk.example.com:8089"
         assert client.token == "testtoken"
     
-    def test_safe_float(self):
-        """Test safe float conversion."""
-        from mcp_server.clients.splunk_client import SplunkClient
+    def test_session_creation(self):
+        """Test session is created once with bearer auth."""
+        client = SplunkClient(host="https://splunk.example.com:8089", token="testtoken")
         
-        assert SplunkClient._safe_float("123.45") == 123.45
-        assert SplunkClient._safe_float(None) is None
-        assert SplunkClient._safe_float("invalid") is None
+        session = client.session
+        
+        assert session.headers["Authorization"] == "Bearer testtoken"
+        assert session.verify is True
+        assert client.session is session
     
-    def test_safe_int(self):
-        """Test safe int conversion."""
-        from mcp_server.clients.splunk_client import SplunkClient
+    def test_session_uses_ca_bundle(self, monkeypatch):
+        """Test a configured CA bundle is used to verify the Splunk certificate."""
+        monkeypatch.setenv("SPLUNK_CA_BUNDLE", "/etc/ssl/certs/splunk-ca.pem")
         
-        assert SplunkClient._safe_int("123") == 123
-        assert SplunkClient._safe_int(None) == 0
-        assert SplunkClient._safe_int("invalid") == 0
+        client = SplunkClient(host="https://splunk.example.com:8089", token="testtoken", settings=Settings())
+        
+        assert client.session.verify == "/etc/ssl/certs/splunk-ca.pem"
+    
+    @responses.activate
+    def test_send_events_batches_single_request(self, monkeypatch):
+        """Test many HEC events are sent in one request."""
+        monkeypatch.setenv("SPLUNK_HEC_TOKEN", "hectoken")
+        responses.add(responses.POST, "https://splunk.example.com:8089/services/collector/event", json={"text": "Success"})
+        client = SplunkClient(host="https://splunk.example.com:8089", token="testtoken", settings=Settings())
+        
+        assert client.send_events([{"build": i} for i in range(100)])
+        
+        assert len(responses.calls) == 1
+        request = responses.calls[0].request
+        assert request.headers["Authorization"] == "Splunk hectoken"
+        assert len(request.body.splitlines()) == 100
@@ -0,0 +1,38 @@
+"""
+Tests for the MCP server endpoints.
+"""
+
+import pytest
+
+from mcp_server.server import TOOLS, TOOL_NAMES
+
+
+class TestMCPServer:
+    """Test the MCP server."""
+    
+    @pytest.mark.parametrize("endpoint,key", [("/health", "status"), ("/tools", "tools")])
+    def test_endpoint(self, client, endpoint, key):
+        """Test the health and tool listing endpoints."""
+        response = client.get(endpoint)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert key in data
+        assert "tools" in data
+    
+    def test_health_endpoint(self, client):
+        """Test health check reports healthy with the registered tool names."""
+        response = client.get("/health")
+        
+        assert response.mimetype == "application/json"
+        assert b'"status":"healthy"' in response.data
+        assert tuple(response.get_json()["tools"]) == TOOL_NAMES
+    
+    def test_tools_endpoint_lists_registry(self, client):
+        """Test the tool listing describes every registered tool."""
+        tools = client.get("/tools").get_json()["tools"]
+        
+        assert [tool["name"] for tool in tools] == list(TOOLS)
+        for tool in tools:
+            assert tool["description"] == TOOLS[tool["name"]].description
+            assert tool["parameters"] == TOOLS[tool["name"]].parameters
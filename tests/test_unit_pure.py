@@ -0,0 +1,182 @@
+"""
+Tests for MCP tool and client helpers that need no mocking.
+
+Nothing here patches module globals, so these tests are safe to shard
+across pytest-xdist workers.
+"""
+
+import pytest
+
+from mcp_server.clients.splunk_client import SplunkClient
+from mcp_server.tools.builds import BuildsTool
+from mcp_server.tools.query import QueryTool
+
+
+# Configuration tables
+@pytest.mark.parametrize("tool,attr,key,field,expected", [
+    ("metrics_tool", "FXOS_PLATFORMS", "arm", None, None),
+    ("metrics_tool", "FXOS_PLATFORMS", "fp4k", "outfile", "FP4K-OutFile.txt"),
+    ("metrics_tool", "ASA_PLATFORMS", "arm", None, None),
+    ("metrics_tool", "ASA_PLATFORMS", "arm8", None, None),
+    ("query_tool", "BRANCHES", "fxos_19", None, None),
+    ("query_tool", "BRANCHES", "lina", None, None),
+    ("query_tool", "BRANCHES", "cairo", "splunk_filter", 'branch="cairo"'),
+    ("builds_tool", "PIPELINES", "FXOS_PB", "job_path_env", "JENKINS_JOB_PATH_FXOS_PB"),
+    ("builds_tool", "PIPELINES", "ASA", None, None),
+])
+def test_config_contains(request, tool, attr, key, field, expected):
+    """Test a configuration table has an entry (and the field value, if given)."""
+    config = getattr(request.getfixturevalue(tool), attr)
+    
+    assert key in config
+    if field is not None:
+        assert config[key][field] == expected
+
+
+@pytest.mark.parametrize("attr,count", [("FXOS_PLATFORMS", 9), ("ASA_PLATFORMS", 4)])
+def test_platform_counts(metrics_tool, attr, count):
+    """Test every platform of each job type is configured."""
+    assert len(getattr(metrics_tool, attr)) == count
+
+
+# MetricsTool
+@pytest.mark.parametrize("secs,expected", [(65, "01:05"), (3661, "61:01"), (0, "00:00")])
+def test_format_duration(metrics_tool, secs, expected):
+    """Test duration formatting."""
+    assert metrics_tool._format_duration(secs) == expected
+
+
+def test_parse_timestamp(metrics_tool):
+    """Test build timestamps are parsed as UTC."""
+    assert metrics_tool._parse_timestamp("Tue Nov 25 05:21:30 UTC 2025") == 1764048090.0
+    assert metrics_tool._parse_timestamp("Wed Nov  5 05:21:30 UTC 2025") == 1762320090.0
+    assert metrics_tool._parse_timestamp("Tue Nov 25 5:21:30 UTC 2025") == 1764048090.0
+    assert metrics_tool._calculate_duration("Tue Nov 25 05:21:30 UTC 2025", "Tue Nov 25 05:45:30 UTC 2025") == 1440
+    assert metrics_tool._parse_timestamp("not a timestamp") is None
+
+
+def test_build_regex_patterns(metrics_tool):
+    """Test build time regex patterns."""
+    test_text = """
+    Some log output
+    BUILD_TIME_START: Tue Nov 25 05:21:30 UTC 2025
+    Building...
+    BUILD_TIME_END: Tue Nov 25 05:45:30 UTC 2025
+    Done
+    """
+    
+    start, end = metrics_tool._parse_build_times(test_text)
+    
+    assert start == "Tue Nov 25 05:21:30 UTC 2025"
+    assert end == "Tue Nov 25 05:45:30 UTC 2025"
+    assert metrics_tool._parse_build_times("BUILD_TIME_START: Tue Nov 25 05:21:30 UTC 2025") == (
+        "Tue Nov 25 05:21:30 UTC 2025", None
+    )
+
+
+def test_build_regex_rejects_non_timestamps(metrics_tool):
+    """Test marker lines without a `date` value are not captured."""
+    text = "BUILD_TIME_START: " + "x" * 100_000 + "\nBUILD_TIME_END: Tue Nov 25 05:45:30 UTC 2025"
+    
+    assert metrics_tool._parse_build_times(text) == (None, "Tue Nov 25 05:45:30 UTC 2025")
+    assert metrics_tool._scan_outfile(text.splitlines(), "FXOS")["start"] is None
+
+
+# QueryTool
+def test_format_branch_status_success(query_tool):
+    """Test formatting successful branch status."""
+    result = {
+        "display_name": "FXOS 2.19",
+        "status": "✅ SUCCESS",
+        "make_status": "SUCCESS",
+        "bazel_status": "SUCCESS",
+        "review": "12345",
+        "review_url": "https://swarm.example.com/reviews/12345",
+        "error": None
+    }
+    
+    formatted = query_tool._format_branch_status(result)
+    
+    assert "FXOS 2.19" in formatted
+    assert "SUCCESS" in formatted
+    assert "12345" in formatted
+
+
+def test_format_branch_status_failure(query_tool):
+    """Test formatting failed branch status."""
+    result = {
+        "display_name": "Cairo",
+        "status": "❌ PLATFORM FAILURE",
+        "make_status": "FAILURE",
+        "bazel_status": "SUCCESS",
+        "review": "12345",
+        "review_url": "",
+        "error": "Build failed: missing dependency"
+    }
+    
+    formatted = query_tool._format_branch_status(result)
+    
+    assert "Cairo" in formatted
+    assert "PLATFORM FAILURE" in formatted
+    assert "missing dependency" in formatted
+
+
+def test_bazel_files_are_recognized():
+    """Test which depot paths make a review more than a delta change."""
+    assert QueryTool._is_bazel_file("//depot/fxos/BUILD")
+    assert QueryTool._is_bazel_file("//depot/fxos/BUILD.bazel")
+    assert QueryTool._is_bazel_file("//depot/fxos/defs.bzl")
+    assert not QueryTool._is_bazel_file("//depot/fxos/Makefile")
+    assert not QueryTool._is_bazel_file("//depot/build_tools/Makefile")
+
+
+# BuildsTool
+def test_invalid_pipeline(builds_tool):
+    """Test handling of invalid pipeline."""
+    result = builds_tool.execute("INVALID_PIPELINE", "main")
+    
+    assert "error" in result
+    assert "Unknown pipeline" in result["error"]
+
+
+def test_invalid_pipeline_does_no_jenkins_work():
+    """Test an unknown pipeline is rejected before any session or listener is built."""
+    tool = BuildsTool()
+    
+    tool.execute("invalid_pipeline", "main")
+    
+    assert tool._session is None
+    assert tool._queue_events is None
+
+
+def test_job_paths_resolved_from_env(monkeypatch):
+    """Test job paths come from the environment without changing PIPELINES."""
+    monkeypatch.setenv("JENKINS_JOB_PATH_ASA", "job/ASA")
+    tool = BuildsTool()
+    
+    assert tool._job_paths["ASA"] == "job/ASA"
+    assert tool.PIPELINES is BuildsTool.PIPELINES
+
+
+# SplunkClient
+def test_rows_to_dicts():
+    """Test json_rows results are mapped back to per-row dicts."""
+    data = {"fields": ["Review", "make_result"], "rows": [["123", "SUCCESS"], ["124", "FAILURE"]]}
+    
+    assert SplunkClient._rows_to_dicts(data) == [
+        {"Review": "123", "make_result": "SUCCESS"},
+        {"Review": "124", "make_result": "FAILURE"}
+    ]
+    assert SplunkClient._rows_to_dicts({}) == []
+
+
+@pytest.mark.parametrize("value,expected", [("123.45", 123.45), (None, None), ("invalid", None)])
+def test_safe_float(value, expected):
+    """Test safe float conversion."""
+    assert SplunkClient._safe_float(value) == expected
+
+
+@pytest.mark.parametrize("value,expected", [("123", 123), (None, 0), ("invalid", 0)])
+def test_safe_int(value, expected):
+    """Test safe int conversion."""
+    assert SplunkClient._safe_int(value) == expected